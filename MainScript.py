@@ -77,6 +77,8 @@ def makePsPlugin():
         configFile['Main Script']['CP'].update({'ER':False})
     PSE.writeConfigFile(configFile)
 
+    PluginListeners.makeSubroutineRegistry()
+
     view = View()
     psFrame = view.getThePlugin()
     psFrame.setSize(configFile['Main Script']['CP']['PW'], configFile['Main Script']['CP']['PH'])
@@ -140,6 +142,7 @@ class Controller(PSE.JMRI.jmrit.automat.AbstractAutomaton):
         self.logger.initialLogMessage(self.psLog)
 
         Bundle.setupBundle()
+        PSE.registerShutDownTask()
 
         self.addPatternScriptsButton()
 
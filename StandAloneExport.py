@@ -31,13 +31,14 @@ from opsEntities import PluginListeners
 from opsBundle import Bundle
 
 PSE.PLUGIN_ROOT = PLUGIN_ROOT
-PSE.BUNDLE = Bundle.getBundleForLocale()
 
 PSE.validateConfigFile()
 configFile = PSE.readConfigFile()
 encodingSelection = configFile['Main Script']['CP']['ES']
 PSE.ENCODING = configFile['Main Script']['CP']['EO'][encodingSelection]
 
+PSE.BUNDLE = PSE.FrozenBundle(Bundle.getBundleForLocale())
+
 
 class StandAloneExport(jmri.jmrit.automat.AbstractAutomaton):
 
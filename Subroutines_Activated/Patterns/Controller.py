@@ -11,6 +11,7 @@ This subroutine can be used in conjunction with o2o to create TrainPlayer switch
 from opsEntities import PSE
 from opsEntities import TextReports
 from Subroutines_Activated.Patterns import SetCarsForm_Controller
+from Subroutines_Activated.Patterns import SetCarsForm_Model
 from Subroutines_Activated.Patterns import Model
 from Subroutines_Activated.Patterns import View
 from Subroutines_Activated.Patterns import SubroutineListeners
@@ -18,6 +19,8 @@ from Subroutines_Activated.Patterns import SubroutineListeners
 SCRIPT_NAME = '{}.{}'.format(PSE.SCRIPT_DIR, __name__)
 SCRIPT_REV = 20231001
 
+SUBSCRIBED_PROPERTIES = ['opsPatternReport', 'opsSwitchList']
+
 _psLog = PSE.LOGGING.getLogger('OPS.PT.Controller')
 
 def getSubroutineDropDownItem():
@@ -58,10 +61,6 @@ class TrainsPropertyParser:
     
     def preProcess(self):
 
-        if self.propertyName == 'TrainBuilt' and self.newValue == True:
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
-                PSE.extendManifest(self.propertySource) # The train object is passed in
-
         return
     
     def process(self):
@@ -71,8 +70,8 @@ class TrainsPropertyParser:
     def postProcess(self):
 
         if self.propertyName == 'opsPatternReport':
-            textPatternReport = TextReports.opsTextPatternReport()
-            targetPath = Model.writePatternReport(textPatternReport, True)
+            targetPath = Model.getPatternReportPath(True)
+            TextReports.opsTextPatternReport(targetPath)
             PSE.genericDisplayReport(targetPath)
             Model.patternReportAsCsv()
 
@@ -143,8 +142,8 @@ class StartUp:
 
         _psLog.debug(EVENT)
 
-        configFile = PSE.readConfigFile()
-        selectedTracks = [track for track, flag in configFile['Patterns']['PT'].items() if flag]
+        patternsConfig = PSE.readConfigFile('Patterns')
+        selectedTracks = [track for track, flag in patternsConfig['PT'].items() if flag]
         selectedTracks.sort()
 
         Model.makeJsonTrackPattern(selectedTracks) # Write to a file
@@ -162,11 +161,12 @@ class StartUp:
 
         _psLog.debug(EVENT)
 
-        configFile = PSE.readConfigFile()
-        selectedTracks = [track for track, flag in configFile['Patterns']['PT'].items() if flag]
+        patternsConfig = PSE.readConfigFile('Patterns')
+        selectedTracks = [track for track, flag in patternsConfig['PT'].items() if flag]
         selectedTracks.sort()
  
         Model.resetSwitchList()
+        SetCarsForm_Model.SWITCH_LIST_SESSION.reset()
 
         windowOffset = 200
         for track in selectedTracks:
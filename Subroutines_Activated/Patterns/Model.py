@@ -26,6 +26,8 @@ def resetConfigFileItems():
 
 def initializeSubroutine():
 
+    ModelEntities.clearLocationsByDivision()
+    ModelEntities.clearTrackNames()
     divComboUpdater()
     locComboUpdater()
     makeTrackRows()
@@ -34,6 +36,8 @@ def initializeSubroutine():
 
 def resetSubroutine():
 
+    ModelEntities.clearLocationsByDivision()
+    ModelEntities.clearTrackNames()
     divComboUpdater()
     locComboUpdater()
     makeTrackRows()
@@ -73,11 +77,7 @@ def divComboUpdater():
     frameName = PSE.getBundleItem('Pattern Scripts')
     frame = PSE.JMRI.util.JmriJFrame.getFrame(frameName)
     component = PSE.getComponentByName(frame, 'jDivisions')
-
-    component.removeAllItems()
-    component.addItem(None)
-    for divisionName in PSE.getAllDivisionNames():
-        component.addItem(divisionName)
+    component.setModel(PSE.JAVX_SWING.DefaultComboBoxModel([None] + PSE.getAllDivisionNames()))
 
     configFile['Patterns'].update({'PD':None})
     PSE.writeConfigFile(configFile)
@@ -87,6 +87,8 @@ def divComboUpdater():
 def locComboUpdater():
     """
     Updates the contents of the locations combo box when the listerers detect a change.
+    The combo box model is replaced in one step from ModelEntities.LOCATIONS_BY_DIVISION,
+    so the combo box is not emptied and refilled an item at a time.
     """
 
     _psLog.debug('locComboUpdater')
@@ -97,10 +99,8 @@ def locComboUpdater():
     frame = PSE.JMRI.util.JmriJFrame.getFrame(frameName)
 
     component = PSE.getComponentByName(frame, 'jLocations')
-    component.removeAllItems()
-    component.addItem(None)
-    for locationName in ModelEntities.getLocationNamesByDivision(divisionName):
-        component.addItem(locationName)
+    locationNames = ModelEntities.getLocationNamesByDivision(divisionName)
+    component.setModel(PSE.JAVX_SWING.DefaultComboBoxModel([None] + locationNames))
 
     configFile['Patterns'].update({'PL':None})
     PSE.writeConfigFile(configFile)
@@ -153,7 +153,7 @@ def makeJsonTrackPattern(selectedTracks):
     jsonTrackPattern = makeReportHeader()
     jsonTrackPattern['locations'] = ModelEntities.getDetailsByTrack(selectedTracks, True)
 
-    reportName = PSE.readConfigFile()['Main Script']['US']['OPR'].format('OPS', 'json')
+    reportName = PSE.readConfigFile('Main Script')['US']['OPR'].format('OPS', 'json')
     targetPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
     PSE.genericWriteReport(targetPath, PSE.dumpJson(jsonTrackPattern))
 
@@ -167,18 +167,18 @@ def makeReportHeader():
     OPS Switch List.
     """
 
-    configFile = PSE.readConfigFile()
+    patternsConfig = PSE.readConfigFile('Patterns')
     OSU = PSE.JMRI.jmrit.operations.setup
     
-    locationName = configFile['Patterns']['PL']
+    locationName = patternsConfig['PL']
     divisionName = PSE.LM.getLocationByName(locationName).getDivisionName()
     reportHeader = {}
 
     reportHeader['date'] = PSE.isoTimeStamp()
-    reportHeader['description'] = configFile['Patterns']['TD']
+    reportHeader['description'] = patternsConfig['TD']
     reportHeader['comment'] = ''
     reportHeader['railroad'] = OSU.Setup.getRailroadName()
-    reportHeader['userName'] = configFile['Patterns']['PL']
+    reportHeader['userName'] = patternsConfig['PL']
     reportHeader['location'] = {'userName':locationName}
     reportHeader['division'] = {'userName':divisionName}
 
@@ -187,7 +187,8 @@ def makeReportHeader():
 def makeTrackRows():
     """
     For the plugin GUI.
-    Creates a row of check boxes, one for each track.
+    Updates the row of check boxes, one for each track.
+    Check boxes for tracks already in the row are reused, only added or removed tracks change the row.
     If no tracks for the selected location, displays a message.
     """
 
@@ -198,33 +199,79 @@ def makeTrackRows():
     frameName = PSE.getBundleItem('Pattern Scripts')
     frame = PSE.JMRI.util.JmriJFrame.getFrame(frameName)
     component = PSE.getComponentByName(frame, 'jTracksPanel')
-    
-    label = PSE.getComponentByName(frame, 'jTracksPanelLabel')
-    checkBox = PSE.getComponentByName(frame, 'jTrackCheckBox')
 
-    component.removeAll()
     trackDict = getTrackDict()
+    if sorted(configFile['Patterns']['PT']) == sorted(trackDict):
+        trackDict = configFile['Patterns']['PT']
+    else:
+        configFile['Patterns'].update({'PT':trackDict})
+        PSE.writeConfigFile(configFile)
+
     if trackDict:
-        for track, flag in sorted(trackDict.items()):
+        isChanged = _updateTrackCheckBoxes(frame, component, trackDict)
+    else:
+        isChanged = _showNoTracksLabel(frame, component)
+
+    if isChanged:
+        PSE.indexFrameComponents(frame)
+        frame.validate()
+        frame.repaint()
+
+    return
+
+def _updateTrackCheckBoxes(frame, component, trackDict):
+    """
+    Helper function for makeTrackRows().
+    Returns True if any check box was added, removed or moved.
+    """
+
+    trackCheckBoxes = {}
+    isChanged = False
+    for widget in component.getComponents():
+        if isinstance(widget, PSE.JAVX_SWING.JCheckBox) and widget.getText() in trackDict:
+            trackCheckBoxes[widget.getText()] = widget
+        else:
+            component.remove(widget)
+            isChanged = True
+
+    checkBox = None
+    for i, track in enumerate(sorted(trackDict)):
+        try:
+            trackCheckBox = trackCheckBoxes[track]
+        except KeyError:
+            if not checkBox:
+                checkBox = PSE.getComponentByName(frame, 'jTrackCheckBox')
             trackCheckBox = deepcopy(checkBox)
             trackCheckBox.actionPerformed = trackCheckBoxAction
             trackCheckBox.setText(track)
-            trackCheckBox.setSelected(flag)
             trackCheckBox.setVisible(True)
-            component.add(trackCheckBox)
-    else:
-        trackLabel = deepcopy(label)
-        trackLabel.setText(PSE.getBundleItem('There are no tracks for this selection'))
-        trackLabel.setVisible(True)
-        component.add(trackLabel)
 
-    configFile['Patterns'].update({'PT':trackDict})
-    PSE.writeConfigFile(configFile)
+        trackCheckBox.setSelected(trackDict[track])
+        if i >= component.getComponentCount() or component.getComponent(i) != trackCheckBox:
+            component.add(trackCheckBox, i)
+            isChanged = True
 
-    frame.validate()
-    frame.repaint()
+    return isChanged
 
-    return
+def _showNoTracksLabel(frame, component):
+    """
+    Helper function for makeTrackRows().
+    Returns True if the label replaced the check boxes.
+    """
+
+    widgets = component.getComponents()
+    if len(widgets) == 1 and isinstance(widgets[0], PSE.JAVX_SWING.JLabel):
+        return False
+
+    label = PSE.getComponentByName(frame, 'jTracksPanelLabel')
+
+    component.removeAll()
+    trackLabel = deepcopy(label)
+    trackLabel.setText(PSE.getBundleItem('There are no tracks for this selection'))
+    trackLabel.setVisible(True)
+    component.add(trackLabel)
+
+    return True
 
 def trackCheckBoxAction(EVENT):
     """
@@ -246,22 +293,16 @@ def getTrackDict():
     Used to create the row of track check boxes.
     """
 
-    configFile = PSE.readConfigFile()
-
-    trackDict = {}
+    patternsConfig = PSE.readConfigFile('Patterns')
 
     yardTracksOnlyFlag = None
-    if configFile['Patterns']['PA']:
+    if patternsConfig['PA']:
         # yardTracksOnlyFlag = 'Yard'
         yardTracksOnlyFlag = 'Spur'
 
-    try:
-        trackList = PSE.LM.getLocationByName(configFile['Patterns']['PL']).getTracksByNameList(yardTracksOnlyFlag)
-    except:
-        trackList = []
-
-    for track in trackList:
-        trackDict[unicode(track, PSE.ENCODING)] = False
+    trackDict = {}
+    for track in ModelEntities.getTrackNamesForLocation(patternsConfig['PL'], yardTracksOnlyFlag):
+        trackDict[track] = False
 
     return trackDict
 
@@ -279,20 +320,19 @@ def getSetCarsData(selectedTrack):
     return setCarsData
 
 
-def writePatternReport(textPatternReport, flag):
+def getPatternReportPath(flag):
     """
-    Writes the track pattern report as a text file.
+    Path to the text pattern report or switch list.
+    The report is streamed to this path by TextReports.
     """
 
     if flag: # Report is a track pattern
-        reportName = PSE.readConfigFile()['Main Script']['US']['OPR'].format('OPS', 'txt')
+        reportName = PSE.readConfigFile('Main Script')['US']['OPR'].format('OPS', 'txt')
         targetPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'manifests', reportName)
     else: # Report is a switch list
-        reportName = PSE.readConfigFile()['Main Script']['US']['OSL'].format('OPS', 'txt')
+        reportName = PSE.readConfigFile('Main Script')['US']['OSL'].format('OPS', 'txt')
         targetPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'switchLists', reportName)  
 
-    PSE.genericWriteReport(targetPath, textPatternReport)
-
     return targetPath
 
 def resetSwitchList():
@@ -303,7 +343,7 @@ def resetSwitchList():
     workList = makeReportHeader()
     workList['locations'] = []
 
-    reportName = PSE.readConfigFile()['Main Script']['US']['OSL'].format('OPS', 'json')
+    reportName = PSE.readConfigFile('Main Script')['US']['OSL'].format('OPS', 'json')
     targetPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
     workList = PSE.dumpJson(workList)
     PSE.genericWriteReport(targetPath, workList)
@@ -320,13 +360,13 @@ def patternReportAsCsv():
     if not PSE.JMRI.jmrit.operations.setup.Setup.isGenerateCsvManifestEnabled():
         return
 #  Get json data
-    reportName = PSE.readConfigFile()['Main Script']['US']['OPR'].format('OPS', 'json')
+    reportName = PSE.readConfigFile('Main Script')['US']['OPR'].format('OPS', 'json')
     targetPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
     patternReport = PSE.loadJson(PSE.genericReadReport(targetPath))
 # Process json data into CSV
     patternReportCsv = TextReports.opsCsvGenericReport(patternReport)
 # Write CSV data
-    reportName = PSE.readConfigFile()['Main Script']['US']['OPR'].format('OPS', 'csv')
+    reportName = PSE.readConfigFile('Main Script')['US']['OPR'].format('OPS', 'csv')
     targetPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'csvManifests', reportName)
     PSE.genericWriteReport(targetPath, patternReportCsv)
 
@@ -11,23 +11,45 @@ from opsEntities import PSE
 SCRIPT_NAME = '{}.{}'.format(PSE.SCRIPT_DIR, __name__)
 SCRIPT_REV = 20231001
 
+LOCATIONS_BY_DIVISION = {} # {division name: [location names]}
+TRACK_NAMES = {} # {(location name, track type): [track names]}
+
 def getLocationNamesByDivision(divisionName):
     """
     Returned list is sorted.
+    Locations without a division are listed under None.
+    """
+
+    if not LOCATIONS_BY_DIVISION:
+        makeLocationsByDivision()
+
+    return LOCATIONS_BY_DIVISION.get(divisionName or None, [])
+
+def makeLocationsByDivision():
+    """
+    One sweep of the location manager, indexes the sorted location names by division name.
     """
 
-    locationsByDivision = []
+    LOCATIONS_BY_DIVISION.clear()
+    for location in PSE.LM.getList():
+        divisionName = location.getDivisionName() or None
+        LOCATIONS_BY_DIVISION.setdefault(divisionName, []).append(location.getName())
 
-    if divisionName == None:
-        for location in PSE.LM.getList():
-            if not location.getDivisionName():
-                locationsByDivision.append(location.getName())
-    else:
-        for location in PSE.LM.getList():
-            if location.getDivisionName() == divisionName:
-                locationsByDivision.append(location.getName())
+    for locationNames in LOCATIONS_BY_DIVISION.values():
+        locationNames.sort()
 
-    return sorted(locationsByDivision)
+    return
+
+def clearLocationsByDivision():
+    """
+    Called by:
+    Model.initializeSubroutine
+    Model.resetSubroutine
+    """
+
+    LOCATIONS_BY_DIVISION.clear()
+
+    return
 
 def getDetailsByTrack(selectedTracks, reportToggle):
     """
@@ -49,7 +71,7 @@ def getDetailsByTrack(selectedTracks, reportToggle):
         track = location.getTrackByName(trackName, None)
         carCount = track.getNumberCars()
         loadCount = 0
-        for car in PSE.CM.getList(track):
+        for car in parseRollingStock.getCarsAtTrack(trackName):
             if car.getLoadType() == 'load' or car.getLoadName() == 'L':
                 loadCount += 1
 
@@ -82,16 +104,38 @@ class ParseRollingStock:
 
         self.reportToggle = reportToggle # True = pattern report, False = switch list
 
-        self.configFile = PSE.readConfigFile()
-
-        self.locationName = self.configFile['Patterns']['PL']
+        self.locationName = PSE.readConfigFile('Patterns')['PL']
         self.location = PSE.LM.getLocationByName(self.locationName)
 
         self.trackName = ''
         self.locoDetails = []
         self.carDetails = []
 
+        self.locosByTrack = self.bucketByTrack(PSE.EM.getList())
+        self.carsByTrack = self.bucketByTrack(PSE.CM.getList())
+
         return
+
+    def bucketByTrack(self, rollingStock):
+        """
+        One sweep of the roster, sorts the rolling stock at the pattern location into lists keyed by (location, track).
+        """
+
+        buckets = {}
+        for rs in rollingStock:
+            if rs.getLocationName() != self.locationName:
+                continue
+            buckets.setdefault((self.locationName, rs.getTrackName()), []).append(rs)
+
+        return buckets
+
+    def getLocosAtTrack(self, trackName):
+
+        return self.locosByTrack.get((self.locationName, trackName), [])
+
+    def getCarsAtTrack(self, trackName):
+
+        return self.carsByTrack.get((self.locationName, trackName), [])
     
     def getLocoDetails(self, trackName):
         """
@@ -102,10 +146,8 @@ class ParseRollingStock:
         self.locoDetails = []
 
         self.trackName = trackName
-        track = self.location.getTrackByName(trackName, None)
 
-        locos = PSE.EM.getList(track)
-        for loco in locos:
+        for loco in self.getLocosAtTrack(trackName):
             locoDetails = self.getDetailsForLoco(loco)
             locoDetails.update(self.getDetailsForRollingStock(loco))
             self.locoDetails.append(locoDetails)
@@ -124,10 +166,8 @@ class ParseRollingStock:
         self.carDetails = []
 
         self.trackName = trackName
-        track = self.location.getTrackByName(trackName, None)
 
-        cars = PSE.CM.getList(track)
-        for car in cars:
+        for car in self.getCarsAtTrack(trackName):
             carDetails = self.getDetailsForCar(car)
             carDetails.update(self.getDetailsForRollingStock(car))
             self.carDetails.append(carDetails)
@@ -185,6 +225,8 @@ class ParseRollingStock:
         carDetailDict['caboose'] = carObject.isCaboose()
         carDetailDict['passenger'] = carObject.isPassenger()
         carDetailDict['fred'] = carObject.hasFred()
+    # Scanner sequence number is stored in the car value field
+        carDetailDict['sequence'] = PSE.getRsSequence(carObject)
 
         return carDetailDict
 
@@ -219,30 +261,29 @@ class ParseRollingStock:
 
     def sortLocosByAttribute(self):
         """
-        Try/Except protects against bad edit of config file
-        Sort order of PSE.readConfigFile('US')['SL'] is top down
+        Sorts the loco list by value in PSE.readConfigFile('Patterns')['US']['SL']
+        A value of 0 in PSE.readConfigFile('Patterns')['US']['SL'] means the item is excluded
         """
 
         sortList = PSE.getSortList('SL')
         if not sortList:
-            print('Car list not sorted')
+            print('Engine list not sorted')
             return
 
-    # Sort the loco list
-        for sortKey in PSE.getSortList('SL'):
-            sortKey = sortKey.split()
-            try:
-                self.locoDetails.sort(key=lambda row: row[sortKey[0]][sortKey[1]])
-            except:
-                self.locoDetails.sort(key=lambda row: row[sortKey[0]])
+        try: # Protects against bad edit of config file
+            self.locoDetails.sort(key=PSE.compileSortKey(sortList))
+        except KeyError:
+            print('Engine list not sorted')
+            return
 
         print('Sort engines by {}'.format(sortList))
+
         return
 
     def sortCarsByAttribute(self):
         """
-        Sorts the car list by value in self.configFile['Patterns']['US']['SC']
-        A value of 0 in self.configFile['Patterns']['US']['SC'] means the item is excluded
+        Sorts the car list by value in PSE.readConfigFile('Patterns')['US']['SC']
+        A value of 0 in PSE.readConfigFile('Patterns')['US']['SC'] means the item is excluded
         """
 
         sortList = PSE.getSortList('SC')
@@ -250,35 +291,23 @@ class ParseRollingStock:
             print('Car list not sorted')
             return
 
-    # Sort the car list
-        for sortKey in sortList:
-            sortKey = sortKey.split()
-            try:
-                self.carDetails.sort(key=lambda row: row[sortKey[0]][sortKey[1]])
-            except:
-                self.carDetails.sort(key=lambda row: row[sortKey[0]])
-                
+        try: # Protects against bad edit of config file
+            self.carDetails.sort(key=PSE.compileSortKey(sortList))
+        except KeyError:
+            print('Car list not sorted')
+            return
+
         print('Sort cars by {}'.format(sortList))
 
         return
 
     def sortCarsBySequence(self):
         """
-        If the sequence data is available.
+        The sequence number is captured as an int by getDetailsForCar.
         """
 
-        for car in self.carDetails:
-            carObj = PSE.CM.getByRoadAndNumber(car['road'], car['number'])
-            try:
-                car["sequence"] = carObj.getValue()
-            except:
-                car["sequence"] = 6000
-
-        try:
-            self.carDetails.sort(key=lambda row: row['sequence'])
-            print('Sort cars by sequence number')
-        except:
-            print('Car list not sorted')
+        self.carDetails.sort(key=lambda row: row['sequence'])
+        print('Sort cars by sequence number')
 
         return
 
@@ -293,3 +322,36 @@ def getTrackNamesByLocation(trackType):
         return allTracksAtLoc
     except AttributeError:
         return allTracksAtLoc
+
+def getTrackNamesForLocation(locationName, trackType):
+    """
+    Returns the sorted track names at a location, cached by location name and track type.
+    The cache is cleared by Model.initializeSubroutine, which PluginListeners.LocationsPropertyChange
+    calls when a location or track is added, removed, renamed or retyped.
+    A location that can't be found is not cached.
+    """
+
+    try:
+        return TRACK_NAMES[(locationName, trackType)]
+    except KeyError:
+        pass
+
+    try:
+        trackNames = [unicode(track.getName(), PSE.ENCODING) for track in PSE.LM.getLocationByName(locationName).getTracksByNameList(trackType)]
+    except AttributeError:
+        return []
+
+    TRACK_NAMES[(locationName, trackType)] = sorted(trackNames)
+
+    return TRACK_NAMES[(locationName, trackType)]
+
+def clearTrackNames():
+    """
+    Called by:
+    Model.initializeSubroutine
+    Model.resetSubroutine
+    """
+
+    TRACK_NAMES.clear()
+
+    return
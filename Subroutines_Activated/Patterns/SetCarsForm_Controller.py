@@ -41,8 +41,8 @@ def opsPostProcess(message=None):
     Writes the processed json files to text files.
     """
 
-    textSwitchList = TextReports.opsTextSwitchList()
-    targetPath = Model.writePatternReport(textSwitchList, False)
+    targetPath = Model.getPatternReportPath(False)
+    TextReports.opsTextSwitchList(targetPath)
     PSE.genericDisplayReport(targetPath)
     SetCarsForm_Model.switchListAsCsv()
 
@@ -161,7 +161,7 @@ class CreateSetCarsFrame:
         
         userInputList = SetCarsForm_Model.getUserInputList(self.buttonDict['textBoxEntry'])
         mergedForm = SetCarsForm_Model.mergeSetCarsForm(self.setCarsData, userInputList)
-        SetCarsForm_Model.appendSwitchList(mergedForm) # Write to a file
+        SetCarsForm_Model.appendSwitchList(mergedForm) # Written to a file for the opsSwitchList listeners
 
         PSE.TM.firePropertyChange('opsSwitchList', False, True)
 
@@ -5,6 +5,8 @@
 Methods for the Set Cars Form for Track X form
 """
 
+from collections import OrderedDict
+
 from opsEntities import PSE
 from opsEntities import TextReports
 from Subroutines_Activated.Patterns import ModelEntities
@@ -14,28 +16,83 @@ SCRIPT_REV = 20231001
 
 _psLog = PSE.LOGGING.getLogger('OPS.PT.ModelSetCarsForm')
 
-def appendSwitchList(mergedForm):
+class SwitchListSession:
     """
-    Appends switch lists into one form to make the switch list (OPS) file.
-    Replaces an existing track.
+    The OPS switch list built up from the Set Cars forms, held in memory.
+    Tracks are keyed by track name, a track sent again replaces its earlier entry.
+    switch list-OPS.json is only written by flush, when the switch list is printed.
     """
 
-    reportName = PSE.readConfigFile()['Main Script']['US']['OSL'].format('OPS', 'json')
-    targetPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
-    currentWorkList = PSE.jsonLoadS(PSE.genericReadReport(targetPath))
+    def __init__(self):
+
+        self.workList = None
+        self.tracks = OrderedDict()
+
+        return
+
+    def _getTargetPath(self):
+
+        reportName = PSE.readConfigFile('Main Script')['US']['OSL'].format('OPS', 'json')
+
+        return PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
+
+    def reset(self):
+        """
+        The session is reloaded from the file on its next use.
+        Called by:
+        Patterns.Controller.StartUp.setRsButton
+        """
+
+        self.workList = None
+        self.tracks = OrderedDict()
+
+        return
+
+    def _load(self):
+
+        self.workList = PSE.jsonLoadS(PSE.genericReadReport(self._getTargetPath()))
+        self.tracks = OrderedDict()
+        for track in self.workList['locations']:
+            self.tracks[track['userName']] = track
+
+        return
+
+    def putTrack(self, track):
+        """
+        A replaced track moves to the end of the list, as it did when the file was edited directly.
+        """
+
+        if self.workList is None:
+            self._load()
 
-    trackLookUp = []
-    for i, trackName in enumerate(currentWorkList['locations']):
-        trackLookUp.append((trackName['userName'], i))
+        self.tracks.pop(track['userName'], None)
+        self.tracks[track['userName']] = track
 
-    index = [x[1] for x in trackLookUp if mergedForm['locations'][0]['userName'] == x[0]]
-    if index:
-        currentWorkList['locations'].pop(index[0])
+        return
+
+    def flush(self):
 
-    currentWorkList['locations'].append(mergedForm['locations'][0])
+        if self.workList is None:
+            return
 
-    currentWorkList = PSE.dumpJson(currentWorkList)
-    PSE.genericWriteReport(targetPath, currentWorkList)
+        self.workList['locations'] = list(self.tracks.values())
+        PSE.genericWriteReport(self._getTargetPath(), PSE.dumpJson(self.workList))
+
+        return
+
+
+SWITCH_LIST_SESSION = SwitchListSession()
+
+def appendSwitchList(mergedForm):
+    """
+    Appends switch lists into one form to make the switch list (OPS) file.
+    Replaces an existing track.
+    Called by:
+    SetCarsForm_Controller.CreateSetCarsFrame.switchListButton
+    """
+
+    SWITCH_LIST_SESSION.putTrack(mergedForm['locations'][0])
+    SWITCH_LIST_SESSION.flush()
 
     return
 
@@ -94,25 +151,30 @@ def mergeSetCarsForm(setCarsForm, inputList):
 def moveRollingStock(switchList):
     """
     Set the rolling stock to the selected track.
+    All the moves are applied, then opsSetCarsToTrack is fired once with the list of moved cars,
+    then the rosters that had a move are saved once.
     """
 
-    configFile = PSE.readConfigFile()
+    patternsConfig = PSE.readConfigFile('Patterns')
 
-    ignoreTrackLength = configFile['Patterns']['PI']
-    applySchedule = configFile['Patterns']['AS']
-    toLocation = PSE.LM.getLocationByName(configFile['Patterns']['PL'])
+    ignoreTrackLength = patternsConfig['PI']
+    applySchedule = patternsConfig['AS']
+    toLocation = PSE.LM.getLocationByName(patternsConfig['PL'])
 
     # PSE.TM.firePropertyChange('opsSetCarsToTrack', toLocation.toString(), None) # Bump existing cars seq +1000
     # propertyChangeToggle = False
     # newSequence = 5001
     setCount = 0
+    movedLocos = 0
+    movedCars = []
+    scheduleCache = {}
 
     locos = switchList['locations'][0]['engines']['add']
     for loco in locos:
 
         rollingStock = PSE.EM.getByRoadAndNumber(loco['road'], loco['number'])
         if not rollingStock:
-            _psLog.warning('Not found; ' + car['road'] + car['number'])
+            _psLog.warning('Not found; ' + loco['road'] + loco['number'])
             continue
 
         if loco['location']['track']['userName'] == loco['destination']['track']['userName']:
@@ -126,6 +188,7 @@ def moveRollingStock(switchList):
             setResult = rollingStock.setLocation(toLocation, toTrack, True)
 
         if setResult == 'okay':
+            movedLocos += 1
             setCount += 1
         
     cars = switchList['locations'][0]['cars']['add']
@@ -147,24 +210,27 @@ def moveRollingStock(switchList):
             setResult = rollingStock.setLocation(toLocation, toTrack, True)
 
         if setResult == 'okay':
-            PSE.TM.firePropertyChange('opsSetCarsToTrack', rollingStock, None)
+            movedCars.append(rollingStock)
             setCount += 1
             if toTrack.getTrackType() == 'Spur':
                 rollingStock.setMoves(rollingStock.getMoves() + 1)
             if applySchedule:
-                scheduleUpdate(toTrack, rollingStock)
+                scheduleUpdate(toTrack, rollingStock, scheduleCache)
+
+    commitScheduleHits(scheduleCache)
 
-    PSE.TM.firePropertyChange('opsSetCarsToTrack', None, toLocation.toString()) # Resequence location
-    PSE.EMX.save()
-    PSE.CMX.save()
+    PSE.TM.firePropertyChange('opsSetCarsToTrack', movedCars, toLocation.toString()) # Resequence location
+    PSE.saveRosters(cars=bool(movedCars), engines=bool(movedLocos))
 
     _psLog.info('Rolling stock count: {}, processed.'.format(str(setCount)))
 
     return
 
-def scheduleUpdate(toTrack, rollingStock):
+def scheduleUpdate(toTrack, rollingStock, scheduleCache):
     """
     If the to-track is a spur, try to set the load/empty requirement for the track.
+    scheduleCache holds the schedule items already looked up in this transaction, keyed by (schedule name, car type).
+    Hits are counted in the cache and written by commitScheduleHits.
     Called by:
     moveRollingStock
     """
@@ -172,16 +238,58 @@ def scheduleUpdate(toTrack, rollingStock):
     if toTrack.getTrackType() != 'Spur':
         return
 
+    cacheKey = (toTrack.getScheduleName(), rollingStock.getTypeName())
     try:
-        schedule = PSE.SM.getScheduleByName(toTrack.getScheduleName())
-    except:
-        print('Exception at: Patterns.Model.scheduleUpdate')
+        scheduleEntry = scheduleCache[cacheKey]
+    except KeyError:
+        scheduleEntry = _getScheduleEntry(*cacheKey)
+        scheduleCache[cacheKey] = scheduleEntry
+
+    if not scheduleEntry:
         return
 
-    carType = rollingStock.getTypeName()
-    rollingStock.setLoadName(schedule.getItemByType(carType).getShipLoadName())
-    rollingStock.setDestination(schedule.getItemByType(carType).getDestination(), schedule.getItemByType(carType).getDestinationTrack(), True) # force set dest
-    schedule.getItemByType(carType).setHits(schedule.getItemByType(carType).getHits() + 1)
+    rollingStock.setLoadName(scheduleEntry['shipLoad'])
+    rollingStock.setDestination(scheduleEntry['destination'], scheduleEntry['destinationTrack'], True) # force set dest
+    scheduleEntry['hits'] += 1
+
+    return
+
+def _getScheduleEntry(scheduleName, carType):
+    """
+    Helper function for scheduleUpdate().
+    Returns None if the track has no schedule or the schedule has no item for the car type.
+    """
+
+    schedule = PSE.SM.getScheduleByName(scheduleName)
+    if not schedule:
+        print('No schedule for: ' + scheduleName)
+        return
+
+    scheduleItem = schedule.getItemByType(carType)
+    if not scheduleItem:
+        print('No schedule item for: ' + carType)
+        return
+
+    scheduleEntry = {}
+    scheduleEntry['item'] = scheduleItem
+    scheduleEntry['shipLoad'] = scheduleItem.getShipLoadName()
+    scheduleEntry['destination'] = scheduleItem.getDestination()
+    scheduleEntry['destinationTrack'] = scheduleItem.getDestinationTrack()
+    scheduleEntry['hits'] = 0
+
+    return scheduleEntry
+
+def commitScheduleHits(scheduleCache):
+    """
+    Adds the hits counted in one transaction to each schedule item.
+    Called by:
+    moveRollingStock
+    """
+
+    for scheduleEntry in scheduleCache.values():
+        if scheduleEntry and scheduleEntry['hits']:
+            scheduleItem = scheduleEntry['item']
+            scheduleItem.setHits(scheduleItem.getHits() + scheduleEntry['hits'])
 
     return
 
@@ -195,16 +303,16 @@ def switchListAsCsv():
     if not PSE.JMRI.jmrit.operations.setup.Setup.isGenerateCsvSwitchListEnabled():
         return
 #  Get json data
-    reportName = PSE.readConfigFile()['Main Script']['US']['OSL']
+    reportName = PSE.readConfigFile('Main Script')['US']['OSL']
 
-    reportName = PSE.readConfigFile()['Main Script']['US']['OSL'].format('OPS', 'json')
+    reportName = PSE.readConfigFile('Main Script')['US']['OSL'].format('OPS', 'json')
     targetPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
     patternReport = PSE.loadJson(PSE.genericReadReport(targetPath))
 # Process json data into CSV
     patternReportCsv = TextReports.opsCsvGenericReport(patternReport)
 # Write CSV data
     # fileName = '{}.csv'.format(reportName)
-    reportName = PSE.readConfigFile()['Main Script']['US']['OSL'].format('OPS', 'csv')
+    reportName = PSE.readConfigFile('Main Script')['US']['OSL'].format('OPS', 'csv')
     targetPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'csvSwitchLists', reportName)
     PSE.genericWriteReport(targetPath, patternReportCsv)
 
@@ -16,6 +16,8 @@ from Subroutines_Activated.Scanner import View
 SCRIPT_NAME = '{}.{}'.format(PSE.SCRIPT_DIR, __name__)
 SCRIPT_REV = 20231001
 
+SUBSCRIBED_PROPERTIES = ['TrainMoveComplete', 'opsSetCarsToTrack', 'opsSwitchList']
+
 _psLog = PSE.LOGGING.getLogger('OPS.SC.Controller')
 
 def getSubroutineDropDownItem():
@@ -39,6 +41,19 @@ def getSubroutineDropDownItem():
     return menuItem
 
 
+def extendTrainManifest(manifest):
+    """
+    Adds the scanner sequence to the cars in a built trains' manifest, then sorts by it.
+    Called by:
+    PluginListeners.extendTrainManifest
+    """
+
+    Model.applySequenceToManifest(manifest)
+    Model.sortManifestBySequence(manifest)
+
+    return
+
+
 class TrainsPropertyParser:
     """
     What gets called when any of three listeners are fired:
@@ -56,35 +71,26 @@ class TrainsPropertyParser:
     
     def preProcess(self):
 
-        if self.propertyName == 'TrainBuilt' and self.newValue:
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
-                PSE.extendManifest(self.propertySource) # The train object is passed in
-
         return
     
     def process(self):
 
         if self.propertyName == 'opsSetCarsToTrack':
-            Model.decreaseSequenceNumber(self.oldValue) # self.oldValue is the car object
+            for car in self.oldValue: # self.oldValue is the list of moved car objects
+                Model.decreaseSequenceNumber(car)
             Model.resequenceCarsAtLocation(self.newValue) # self.newValue is the location name
 
         if self.propertyName == 'opsSwitchList':
-            reportName = PSE.readConfigFile()['Main Script']['US']['OSL'].format('OPS', 'json')
+            reportName = PSE.readConfigFile('Main Script')['US']['OSL'].format('OPS', 'json')
             Model.addSequenceToManifest(reportName)
             Model.resequenceManifestJson(reportName)
 
-        if self.propertyName == 'TrainBuilt' and self.newValue:
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
-                manifestName = u'train-{}.json'.format(self.propertySource.toString())
-                Model.addSequenceToManifest(manifestName)
-                Model.resequenceManifestJson(manifestName)
-
         if self.propertyName == 'TrainMoveComplete' and self.newValue:
-            if PSE.readConfigFile()['Main Script']['CP']['ER'] :
+            if PSE.readConfigFile('Main Script')['CP']['ER'] :
                 Model.increaseSequenceNumber(self.newValue.toString())
 
         if self.propertyName == 'TrainMoveComplete' and self.oldValue:
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
+            if PSE.readConfigFile('Main Script')['CP']['ER']:
                 Model.resequenceCarsAtLocation(self.oldValue.toString())
 
         return
@@ -158,10 +164,26 @@ class StartUp:
         return
 
     def qrCodeButton(self, EVENT):
+        """
+        Previews the rfid import, the changes are made only if the user confirms.
+        With nothing to change, the counts are shown so the user knows the import ran.
+        """
 
         _psLog.debug(EVENT)
 
-        Model.applyRfidData()
+        changes, errors = Model.applyRfidData(dryRun=True)
+
+        JOP = PSE.JAVX_SWING.JOptionPane
+        summary = PSE.getBundleItem('Rfid changes:{},  Line errors:{}').format(len(changes), len(errors))
+        title = PSE.getBundleItem('Sequence Rolling Stock')
+        if not changes:
+            messageType = JOP.WARNING_MESSAGE if errors else JOP.INFORMATION_MESSAGE
+            JOP.showMessageDialog(EVENT.getSource(), summary, title, messageType)
+            return
+
+        message = u'{}\n{}'.format(summary, PSE.getBundleItem('Apply the rfid changes?'))
+        if JOP.showConfirmDialog(EVENT.getSource(), message, title, JOP.YES_NO_OPTION) == JOP.YES_OPTION:
+            Model.commitRfidChanges(changes)
 
         return
 
@@ -12,6 +12,8 @@ SCRIPT_REV = 20231001
 
 _psLog = PSE.LOGGING.getLogger('OPS.SC.Model')
 
+SCANNER_WATCHER = None
+
 
 """ Routines called by the plugin listeners """
 
@@ -32,6 +34,12 @@ def resetSubroutine():
     return
 
 def refreshSubroutine():
+    """
+    While the watcher runs it keeps the scanner combo box current.
+    """
+
+    if SCANNER_WATCHER:
+        return
 
     if _validateScannerLocation():
         scannerComboUpdater()
@@ -43,6 +51,8 @@ def addSubroutineListeners():
     Add any listeners specific to this subroutine.
     """
 
+    startScannerWatcher()
+
     return
 
 def removeSubroutineListeners():
@@ -50,6 +60,8 @@ def removeSubroutineListeners():
     Removes any listeners specific to this subroutine.
     """
 
+    stopScannerWatcher()
+
     return
 
 
@@ -61,7 +73,7 @@ def decreaseSequenceNumber(car):
     if not car:
         return
 
-    car.setValue(str(int(car.getValue()) - 1000))
+    car.setValue(str(PSE.getRsSequence(car) - 1000))
 
     return
 
@@ -74,13 +86,12 @@ def increaseSequenceNumber(locationName):
 
     if not locationName:
         return
-    
-    for track in PSE.LM.getLocationByName(locationName).getTracksList():
-        for car in PSE.CM.getList(track):
-            increaseValue = int(car.getValue()) + 1000
-            car.setValue(str(increaseValue))
 
-    PSE.CMX.save()
+    for carSeqList in getSequencesByTrack(locationName).values():
+        for sequence, car in carSeqList:
+            car.setValue(str(sequence + 1000))
+
+    PSE.saveRosters(cars=True)
 
     return
 
@@ -88,6 +99,7 @@ def resequenceCarsAtLocation(locationName):
     """
     Cars are ordered by existing sequence number,
     then given a new 600* sequence number.
+    Only cars whose number changes are set, a track already in order is left alone.
     """
 
     _psLog.debug('resequenceCarsAtLocation')
@@ -95,21 +107,40 @@ def resequenceCarsAtLocation(locationName):
     if not locationName:
         return
 
-    for track in PSE.LM.getLocationByName(locationName).getTracksList():
-        carSeqList = []
-        for car in PSE.CM.getList(track):
-            carSeqList.append((car.getValue(), car))
-
+    renumberedTracks = 0
+    for carSeqList in getSequencesByTrack(locationName).values():
         carSeqList.sort(key=lambda row: row[0])
-        reSequence = 6001
-        for item in carSeqList:
-            item[1].setValue(str(reSequence))
-            reSequence += 1
+        isRenumbered = False
+        for newSequence, (sequence, car) in enumerate(carSeqList, 6001):
+            if sequence != newSequence:
+                car.setValue(str(newSequence))
+                isRenumbered = True
 
-    PSE.CMX.save()
+        if isRenumbered:
+            renumberedTracks += 1
+
+    if renumberedTracks:
+        PSE.saveRosters(cars=True)
+
+    _psLog.debug('Tracks renumbered at {}: {}'.format(locationName, renumberedTracks))
 
     return
 
+def getSequencesByTrack(locationName):
+    """
+    One sweep of the car roster.
+    Returns {track name: [(sequence, car)]} for the cars at a location, in roster order.
+    """
+
+    sequencesByTrack = {}
+    for car in PSE.CM.getList():
+        if car.getLocationName() != locationName or not car.getTrackName():
+            continue
+
+        sequencesByTrack.setdefault(car.getTrackName(), []).append((PSE.getRsSequence(car), car))
+
+    return sequencesByTrack
+
 def validateSequenceEntries():
 
     _psLog.debug('validateSequenceEntries')
@@ -129,42 +160,103 @@ def validateSequenceEntries():
 
     return
 
-def applyRfidData():
+def applyRfidData(dryRun=False):
     """
     Not the real function that goes here.
     This one just imports a TrainPlayer file.
+    Each line is 'road number,rfid'. The file is read a line at a time and
+    road and number are looked up in an index made from one sweep of the rosters.
+    With dryRun, the changes are reported but not made, commitRfidChanges makes them later.
+    Returns the list of changes and the list of line errors.
+    A missing file is returned as a line 0 error.
+    Called by:
+    Controller.StartUp.qrCodeButton
     """
 
     _psLog.debug('applyRfidData')
 
     fileName = 'TrainPlayer Report - rfidRoster.txt'
     targetPath = PSE.OS_PATH.join(PSE.JMRI.util.FileUtil.getHomePath(), 'AppData', 'Roaming', 'TrainPlayer', 'Reports', fileName)
-    if PSE.JAVA_IO.File(targetPath).isFile():
-        rfidData = PSE.genericReadReport(targetPath).split('\n')
-        rfidData = rfidData[:-1]
-    else:
+    if not PSE.JAVA_IO.File(targetPath).isFile():
         print('Not found: TrainPlayer Report - rfidRoster.txt')
-        return
+        _psLog.warning('Not found: ' + targetPath)
+        return [], [(0, fileName, 'Not found')]
+
+    rsIndex = makeRoadNumberIndex()
+
+    changes = [] # (kind, rs, rfid)
+    errors = [] # (line number, line, reason)
+    for lineNumber, line in enumerate(PSE.genericReadReportLines(targetPath), 1):
+        if not line.strip():
+            continue
+
+        splitLine = line.split(',')
+        if len(splitLine) < 2:
+            errors.append((lineNumber, line, 'No rfid'))
+            continue
 
-    for data in rfidData:
-        splitLine = data.split(',')
         rsName = splitLine[0].split(' ')
-        rfid = splitLine[1]
-        
+        rfid = splitLine[1].strip()
+        if len(rsName) < 2 or not rfid:
+            errors.append((lineNumber, line, 'Not road number,rfid'))
+            continue
+
         try:
-            rs = PSE.EM.getByRoadAndNumber(rsName[0], rsName[1])
-            rs.setValue('6000')
-            rs.setRfid(rfid)
-        except:
-            rs = PSE.CM.getByRoadAndNumber(rsName[0], rsName[1])
-            rs.setValue('6000')
-            rs.setRfid(rfid)
+            kind, rs = rsIndex[(rsName[0], rsName[1])]
+        except KeyError:
+            errors.append((lineNumber, line, 'Rolling stock not found'))
+            continue
 
-    PSE.EMX.save()
-    PSE.CMX.save()
+        if rs.getRfid() != rfid or rs.getValue() != '6000':
+            changes.append((kind, rs, rfid))
+
+    for kind, rs, rfid in changes:
+        _psLog.info(u'{} {} rfid: {} -> {}'.format(rs.getRoadName(), rs.getNumber(), rs.getRfid(), rfid))
+    for lineNumber, line, reason in errors:
+        _psLog.warning(u'rfidRoster line {}: {}, {}'.format(lineNumber, reason, line))
+
+    _psLog.info('Rolling stock rfid changes: {}'.format(len(changes)))
+    _psLog.info('Rolling stock rfid line errors: {}'.format(len(errors)))
+
+    if not dryRun:
+        commitRfidChanges(changes)
+
+    return changes, errors
+
+def commitRfidChanges(changes):
+    """
+    Makes the changes found by applyRfidData.
+    Called by:
+    Controller.StartUp.qrCodeButton
+    """
+
+    for kind, rs, rfid in changes:
+        rs.setValue('6000')
+        rs.setRfid(rfid)
+
+    changedKinds = set([change[0] for change in changes])
+    PSE.saveRosters(cars='car' in changedKinds, engines='engine' in changedKinds)
+
+    _psLog.info('Rolling stock rfid changes applied: {}'.format(len(changes)))
 
     return
 
+def makeRoadNumberIndex():
+    """
+    One sweep of the engine and car rosters.
+    Returns {(road, number): (kind, rolling stock object)}, kind is 'engine' or 'car'.
+    An engine is used over a car with the same road and number.
+    """
+
+    rsIndex = {}
+    for car in PSE.CM.getList():
+        rsIndex[(car.getRoadName(), car.getNumber())] = ('car', car)
+
+    for loco in PSE.EM.getList():
+        rsIndex[(loco.getRoadName(), loco.getNumber())] = ('engine', loco)
+
+    return rsIndex
+
 def scannerComboUpdater():
     """
     Updates the contents of the scanners combo box.
@@ -192,8 +284,8 @@ def _validateScannerLocation():
     _psLog.debug('_validateScannerLocation')
 
     result = True
-    configFile = PSE.readConfigFile()
-    scannerPath = configFile['Scanner']['US']['SP']
+    scannerConfig = PSE.readConfigFile('Scanner')
+    scannerPath = scannerConfig['US']['SP']
     if not PSE.JAVA_IO.File(scannerPath).isDirectory():
         message = '{}:\n{}'
         PSE.openOutputFrame(message.format(PSE.getBundleItem('ALERT: Scanner directory not found'), scannerPath))
@@ -208,8 +300,8 @@ def _updateScannerList():
 
     _psLog.debug('_updateScannerList')
 
-    configFile = PSE.readConfigFile()
-    scannerPath = configFile['Scanner']['US']['SP']
+    scannerConfig = PSE.readConfigFile('Scanner')
+    scannerPath = scannerConfig['US']['SP']
     dirContents = PSE.JAVA_IO.File(scannerPath).list()
 
     pulldownList = []
@@ -222,8 +314,8 @@ def getScannerReportPath():
 
     _psLog.debug('getScannerReportPath')
 
-    configFile = PSE.readConfigFile()
-    scannerPath = configFile['Scanner']['US']['SP']
+    scannerConfig = PSE.readConfigFile('Scanner')
+    scannerPath = scannerConfig['US']['SP']
 
     frameName = PSE.getBundleItem('Pattern Scripts')
     frame = PSE.JMRI.util.JmriJFrame.getFrame(frameName)
@@ -244,40 +336,60 @@ def validateScanReport(scannerReportPath=None):
 
     return True
 
-def applyScanReport(scannerReportPath):
+def makeRfidIndex():
+    """
+    One sweep of the engine and car rosters.
+    Returns {rfid: (kind, rolling stock object)}, kind is 'engine' or 'car'.
+    If an engine and a car share a tag, the engine is used.
+    """
+
+    rfidIndex = {}
+    for car in PSE.CM.getList():
+        if car.getRfid():
+            rfidIndex[car.getRfid()] = ('car', car)
+
+    for loco in PSE.EM.getList():
+        if loco.getRfid():
+            rfidIndex[loco.getRfid()] = ('engine', loco)
+
+    return rfidIndex
+
+def applyScanReport(scannerReportPath, rfidIndex=None):
     """
     Assign a sequence number to the RS in the selected scan report.
+    rfidIndex is built for this scan if the caller does not pass one.
     """
 
     _psLog.debug('applyScanReport')
 
+    if rfidIndex is None:
+        rfidIndex = makeRfidIndex()
+
     locoSequence = 6001
     carSequence = 6001
 
-    scannerReport = PSE.genericReadReport(scannerReportPath)
-    scannerReport = scannerReport.split('\n')
-    scannerName = scannerReport.pop(0)
-    scanDirection = scannerReport.pop(0)
-
-    if scanDirection == 'W':
-        scannerReport.reverse()
+    scannerName, scannerReport = readScanReport(scannerReportPath)
 
     e = 0
     c = 0
+    unknownTags = []
     for item in scannerReport:
-        rs = PSE.EM.getByRfid('ID' + item)
-        if rs:
+        try:
+            kind, rs = rfidIndex['ID' + item]
+        except KeyError:
+            unknownTags.append(item)
+            continue
+
+        if kind == 'engine':
             rs.setValue(str(locoSequence))
             locoSequence += 1
             e += 1
-        rs = PSE.CM.getByRfid('ID' + item)
-        if rs:
+        else:
             rs.setValue(str(carSequence))
             carSequence += 1
             c += 1
 
-    PSE.EMX.save()
-    PSE.CMX.save()
+    PSE.saveRosters(cars=bool(c), engines=bool(e))
 
     _psLog.info('applyScanReport for scanner: {}'.format(scannerName))
     _psLog.info('Number of engines sequenced: {}'.format(e))
@@ -286,6 +398,102 @@ def applyScanReport(scannerReportPath):
     print('Number of engines sequenced: {}'.format(e))
     print('Number of cars sequenced: {}'.format(c))
 
+    if unknownTags:
+        _psLog.warning('Unknown tags: {}, {}'.format(len(unknownTags), ', '.join(unknownTags)))
+        print('Number of unknown tags: {}'.format(len(unknownTags)))
+
+    return
+
+def readScanReport(scannerReportPath):
+    """
+    Returns the scanner name and the list of tags in the report, in scan order.
+    Raises ValueError if the report has no scanner name and direction lines.
+    """
+
+    scannerReport = PSE.genericReadReport(scannerReportPath)
+    scannerReport = scannerReport.split('\n')
+    if len(scannerReport) < 2:
+        raise ValueError('Not a scanner report')
+
+    scannerName = scannerReport.pop(0)
+    scanDirection = scannerReport.pop(0)
+
+    if scanDirection == 'W':
+        scannerReport.reverse()
+
+    return scannerName, [item for item in scannerReport if item]
+
+def applyScanReports(scannerReportPaths, rfidIndex=None):
+    """
+    Batch mode for applyScanReport.
+    The reports are read oldest first by file modified time.
+    A report that can't be read is logged and skipped, the rest of the batch is applied.
+    A car or engine found in more than one report keeps its place in the newest report.
+    Sequences are then numbered from 6001 for each track, the rosters are saved once.
+    Called by:
+    ScannerWatcher.poll
+    """
+
+    _psLog.debug('applyScanReports')
+
+    if rfidIndex is None:
+        rfidIndex = makeRfidIndex()
+
+    scannerReportPaths = sorted(scannerReportPaths, key=lambda path: PSE.JAVA_IO.File(path).lastModified())
+
+    lastSeen = {} # {rfid: (report order, tag order, kind, rs)}
+    unknownTags = []
+    conflicts = 0
+    appliedReports = 0
+    for reportOrder, scannerReportPath in enumerate(scannerReportPaths):
+        try:
+            scannerName, scannerReport = readScanReport(scannerReportPath)
+        except (IOError, ValueError) as e:
+            _psLog.warning(u'Scanner report skipped: {}, {}'.format(scannerReportPath, e))
+            continue
+
+        appliedReports += 1
+        _psLog.info('applyScanReports for scanner: {}'.format(scannerName))
+
+        for tagOrder, item in enumerate(scannerReport):
+            rfid = 'ID' + item
+            try:
+                kind, rs = rfidIndex[rfid]
+            except KeyError:
+                unknownTags.append(item)
+                continue
+
+            if rfid in lastSeen and lastSeen[rfid][0] != reportOrder:
+                conflicts += 1
+            lastSeen[rfid] = (reportOrder, tagOrder, kind, rs)
+
+    byTrack = {} # {(kind, location, track): [(report order, tag order, rs)]}
+    for reportOrder, tagOrder, kind, rs in lastSeen.values():
+        trackKey = (kind, rs.getLocationName(), rs.getTrackName())
+        byTrack.setdefault(trackKey, []).append((reportOrder, tagOrder, rs))
+
+    e = 0
+    c = 0
+    for (kind, locationName, trackName), scans in byTrack.items():
+        scans.sort(key=lambda row: (row[0], row[1]))
+        for sequence, (reportOrder, tagOrder, rs) in enumerate(scans, 6001):
+            rs.setValue(str(sequence))
+
+        if kind == 'engine':
+            e += len(scans)
+        else:
+            c += len(scans)
+
+    PSE.saveRosters(cars=bool(c), engines=bool(e))
+
+    _psLog.info('Number of reports applied: {}'.format(appliedReports))
+    _psLog.info('Number of engines sequenced: {}'.format(e))
+    _psLog.info('Number of cars sequenced: {}'.format(c))
+    if conflicts:
+        _psLog.info('Tags found in more than one report: {}'.format(conflicts))
+    if unknownTags:
+        _psLog.warning('Unknown tags: {}, {}'.format(len(unknownTags), ', '.join(unknownTags)))
+
     return
 
 def recordSelection(comboBox):
@@ -311,22 +519,28 @@ def addSequenceToManifest(reportName):
     reportPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
     manifest = PSE.loadJson(PSE.genericReadReport(reportPath))
 
+    applySequenceToManifest(manifest)
+    
+    PSE.genericWriteReport(reportPath, PSE.dumpJson(manifest))
+    
+    return
+
+def applySequenceToManifest(manifest):
+    """
+    Add the sequence attribute to a manifest already in memory.
+    The sequence is stored as an int so the manifest sorts numerically.
+    """
+
     for location in manifest['locations']:
         for car in location['cars']['add']:
             carObj = PSE.CM.getByRoadAndNumber(car['road'], car['number'])
-            seqValue = carObj.getValue()
-            if seqValue and isinstance(int(seqValue), int):
-                car['sequence'] = carObj.getValue()
+            car['sequence'] = PSE.getRsSequence(carObj)
 
         for car in location['cars']['remove']:
             carObj = PSE.CM.getByRoadAndNumber(car['road'], car['number'])
-            seqValue = carObj.getValue()
-            if seqValue and isinstance(int(seqValue), int):
-                car['sequence'] = carObj.getValue()
-    
-    PSE.genericWriteReport(reportPath, PSE.dumpJson(manifest))
-    
-    return
+            car['sequence'] = PSE.getRsSequence(carObj)
+
+    return manifest
 
 def resequenceManifestJson(reportName):
     """
@@ -339,6 +553,17 @@ def resequenceManifestJson(reportName):
     reportPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
     manifest = PSE.loadJson(PSE.genericReadReport(reportPath))
 
+    sortManifestBySequence(manifest)
+
+    PSE.genericWriteReport(reportPath, PSE.dumpJson(manifest))
+
+    return
+
+def sortManifestBySequence(manifest):
+    """
+    Sorts the cars of a manifest already in memory by their sequence value.
+    """
+
     for location in manifest['locations']:
         cars = location['cars']['add']
         cars.sort(key=lambda row: row['sequence'])
@@ -346,6 +571,213 @@ def resequenceManifestJson(reportName):
         cars = location['cars']['remove']
         cars.sort(key=lambda row: row['sequence'])
 
-    PSE.genericWriteReport(reportPath, PSE.dumpJson(manifest))
+    return manifest
+
+
+""" Scanner directory watcher """
+
+
+class ScannerWatcher:
+    """
+    Watches the .txt scanner reports in the Scanner US SP directory on a daemon thread.
+    A new or changed scanner report is applied once its modified time and size are the same on two polls in a row,
+    so a file still being written is left alone.
+    The reports that settle together are read one at a time, the readable ones are applied as one batch, on the EDT.
+    A report that can't be read is skipped until it changes.
+    Reports already in the directory when the watch starts are listed but not applied.
+    The directory is re-read from the config file on every poll,
+    when it changes the reports in the new directory are treated like those at the start.
+    A directory that does not exist is checked again on the next poll.
+    """
+
+    POLL_INTERVAL = 2.0
+
+    def __init__(self, scannerPath):
+
+        self.scannerPath = scannerPath
+        self.applied = {} # {file name: (modified time, size)}
+        self.pending = {} # {file name: (modified time, size)}
+        self.listed = set()
+        self.stopEvent = PSE.THREADING.Event()
+        self.thread = None
+
+        return
+
+    def start(self):
+
+        self._resetReports()
+
+        self.thread = PSE.THREADING.Thread(target=self._run, name='OPS Scanner watcher')
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+        _psLog.info('Watching scanner directory: ' + self.scannerPath)
+
+        return
+
+    def stop(self):
+        """
+        Not joined, the EDT may be the caller.
+        A poll already running checks stopEvent before it applies anything.
+        """
+
+        self.stopEvent.set()
+
+        return
+
+    def _resetReports(self):
+
+        self.applied = self._listReports()
+        self.pending = {}
+        self.listed = set(self.applied)
+
+        return
+
+    def _listReports(self):
+
+        reports = {}
+        for reportFile in PSE.JAVA_IO.File(self.scannerPath).listFiles() or []:
+            if reportFile.isFile() and reportFile.getName().lower().endswith('.txt'):
+                reports[reportFile.getName()] = (reportFile.lastModified(), reportFile.length())
+
+        return reports
+
+    def _run(self):
+
+        while not self.stopEvent.wait(self.POLL_INTERVAL):
+            try:
+                self.poll()
+            except Exception as e:
+                _psLog.warning('Scanner watcher: {}'.format(e))
+
+        return
+
+    def poll(self):
+        """
+        Updates the combo box with added or removed reports,
+        then applies the reports that have settled since the last poll.
+        """
+
+        scannerPath = PSE.readConfigFile('Scanner')['US']['SP']
+        if scannerPath != self.scannerPath:
+            _psLog.info('Watching scanner directory: ' + scannerPath)
+            self.scannerPath = scannerPath
+            listed = self.listed
+            self._resetReports()
+            self.listed = listed
+
+        if not PSE.JAVA_IO.File(self.scannerPath).isDirectory():
+            return
+
+        reports = self._listReports()
+
+        added = set(reports) - self.listed
+        removed = self.listed - set(reports)
+        if added or removed:
+            self.listed = set(reports)
+            PSE.JAVX_SWING.SwingUtilities.invokeLater(lambda: updateScannerCombo(added, removed))
+
+        for fileName in removed:
+            self.applied.pop(fileName, None)
+            self.pending.pop(fileName, None)
+
+        settled = []
+        for fileName, fingerprint in reports.items():
+            if self.applied.get(fileName) == fingerprint:
+                continue
+            if self.pending.get(fileName) == fingerprint:
+                settled.append(fileName)
+            else:
+                self.pending[fileName] = fingerprint
+
+        if not settled or self.stopEvent.isSet():
+            return
+
+        reportPaths = []
+        for fileName in settled:
+            reportPath = PSE.OS_PATH.join(self.scannerPath, fileName)
+            try:
+                readScanReport(reportPath)
+                reportPaths.append(reportPath)
+            except (IOError, ValueError) as e:
+                _psLog.warning(u'Scanner report not applied: {}, {}'.format(fileName, e))
+
+        try:
+            if reportPaths:
+                PSE.JAVX_SWING.SwingUtilities.invokeAndWait(lambda: self._applyReports(reportPaths))
+        finally:
+            for fileName in settled:
+                self.applied[fileName] = self.pending.pop(fileName)
+
+        return
+
+    def _applyReports(self, reportPaths):
+        """
+        Runs on the EDT, the watcher may have been stopped while this waited to run.
+        """
+
+        if self.stopEvent.isSet():
+            return
+
+        applyScanReports(reportPaths)
+
+        return
+
+
+def startScannerWatcher():
+    """
+    Called by:
+    addSubroutineListeners
+    """
+
+    global SCANNER_WATCHER
+
+    stopScannerWatcher()
+
+    scannerPath = PSE.readConfigFile('Scanner')['US']['SP']
+    SCANNER_WATCHER = ScannerWatcher(scannerPath)
+    SCANNER_WATCHER.start()
+
+    return
+
+def stopScannerWatcher():
+    """
+    Called by:
+    removeSubroutineListeners
+    """
+
+    global SCANNER_WATCHER
+
+    if SCANNER_WATCHER:
+        SCANNER_WATCHER.stop()
+        SCANNER_WATCHER = None
+
+    return
+
+def updateScannerCombo(added, removed):
+    """
+    Adds and removes scanner names in the combo box without rebuilding it.
+    Runs on the Swing thread.
+    """
+
+    frameName = PSE.getBundleItem('Pattern Scripts')
+    frame = PSE.JMRI.util.JmriJFrame.getFrame(frameName)
+    component = PSE.getComponentByName(frame, 'sScanner')
+    if not component:
+        return
+
+    comboItems = [component.getItemAt(i) for i in range(component.getItemCount())]
+
+    for fileName in removed:
+        scanName = fileName.split('.')[0]
+        if scanName in comboItems:
+            component.removeItem(scanName)
+            comboItems.remove(scanName)
+
+    for fileName in sorted(added):
+        scanName = fileName.split('.')[0]
+        if scanName not in comboItems:
+            component.addItem(scanName)
+            comboItems.append(scanName)
 
     return
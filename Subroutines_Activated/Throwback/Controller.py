@@ -14,6 +14,8 @@ from Subroutines_Activated.Throwback import View
 SCRIPT_NAME = '{}.{}'.format(PSE.SCRIPT_DIR, __name__)
 SCRIPT_REV = 20231001
 
+SUBSCRIBED_PROPERTIES = []
+
 _psLog = PSE.LOGGING.getLogger('OPS.TB.Controller')
 
 def getSubroutineDropDownItem():
@@ -54,10 +56,6 @@ class TrainsPropertyParser:
     
     def preProcess(self):
 
-        if self.propertyName == 'TrainBuilt' and self.newValue:
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
-                PSE.extendManifest(self.propertySource)
-
         return
     
     def process(self):
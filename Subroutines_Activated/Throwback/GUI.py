@@ -37,7 +37,7 @@ class subroutineGui:
         Make the GUI here.
         """
 
-        throwbackCommits = PSE.readConfigFile()['Throwback']['TC']
+        throwbackCommits = PSE.readConfigFile('Throwback')['TC']
         lastCommit = throwbackCommits[-1]
 
     # Selection
@@ -15,6 +15,8 @@ from Subroutines_Activated.jPlus import View
 SCRIPT_NAME = '{}.{}'.format(PSE.SCRIPT_DIR, __name__)
 SCRIPT_REV = 20231001
 
+SUBSCRIBED_PROPERTIES = ['opsPatternReport', 'opsSwitchList']
+
 _psLog = PSE.LOGGING.getLogger('OPS.JP.Controller')
 
 def getSubroutineDropDownItem():
@@ -36,6 +38,18 @@ def getSubroutineDropDownItem():
     return menuItem
 
 
+def extendTrainManifest(manifest):
+    """
+    Adds the jPlus railroad name to a built trains' manifest.
+    Called by:
+    PluginListeners.extendTrainManifest
+    """
+
+    Model.addExtendedDataToReport(manifest)
+
+    return
+
+
 class TrainsPropertyParser:
     """
     What gets called when any of three listeners are fired:
@@ -53,26 +67,18 @@ class TrainsPropertyParser:
     
     def preProcess(self):
 
-        if self.propertyName == 'TrainBuilt' and self.newValue:
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
-                PSE.extendManifest(self.propertySource) # The train object is passed in
         return
     
     def process(self):
 
         if self.propertyName == 'opsSwitchList':
-            reportName = PSE.readConfigFile()['Main Script']['US']['OSL'].format('OPS', 'json')
+            reportName = PSE.readConfigFile('Main Script')['US']['OSL'].format('OPS', 'json')
             Model.addExtendedDataToManifest(reportName)
 
         if self.propertyName == 'opsPatternReport':
-            reportName = PSE.readConfigFile()['Main Script']['US']['OPR'].format('OPS', 'json')
+            reportName = PSE.readConfigFile('Main Script')['US']['OPR'].format('OPS', 'json')
             Model.addExtendedDataToManifest(reportName)
 
-        if self.propertyName == 'TrainBuilt' and self.newValue:
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
-                manifestName = u'train-{}.json'.format(self.propertySource.toString())
-                Model.addExtendedDataToManifest(manifestName)
-
         return
     
     def postProcess(self):
@@ -26,25 +26,25 @@ def initializeSubroutine():
     Set values from the config file.
     """
 
-    configFile = PSE.readConfigFile()
+    layoutDetails = PSE.readConfigFile('jPlus')['LD']
 
     frameName = PSE.getBundleItem('Pattern Scripts')
     frame = PSE.JMRI.util.JmriJFrame.getFrame(frameName)
 
     component = PSE.getComponentByName(frame, 'operatingRoad')
-    value = configFile['jPlus']['LD']['OR']
+    value = layoutDetails['OR']
     component.setText(value)
 
     component = PSE.getComponentByName(frame, 'territory')
-    value = configFile['jPlus']['LD']['TR']
+    value = layoutDetails['TR']
     component.setText(value)
 
     component = PSE.getComponentByName(frame, 'location')
-    value = configFile['jPlus']['LD']['LO']
+    value = layoutDetails['LO']
     component.setText(value)
 
     component = PSE.getComponentByName(frame, 'useExtended')
-    flag = configFile['jPlus']['LD']['EH']
+    flag = layoutDetails['EH']
     component.setSelected(flag)
 
     return
@@ -70,25 +70,25 @@ def resetSubroutine():
 
 def refreshSubroutine():
 
-    configFile = PSE.readConfigFile()
+    layoutDetails = PSE.readConfigFile('jPlus')['LD']
     
     frameName = PSE.getBundleItem('Pattern Scripts')
     frame = PSE.JMRI.util.JmriJFrame.getFrame(frameName)
 
     component = PSE.getComponentByName(frame, 'operatingRoad')
-    component.setText(configFile['jPlus']['LD']['OR'])
+    component.setText(layoutDetails['OR'])
 
     component = PSE.getComponentByName(frame, 'territory')
-    component.setText(configFile['jPlus']['LD']['TR'])
+    component.setText(layoutDetails['TR'])
 
     component = PSE.getComponentByName(frame, 'location')
-    component.setText(configFile['jPlus']['LD']['LO'])
+    component.setText(layoutDetails['LO'])
 
     component = PSE.getComponentByName(frame, 'yearModeled')
-    component.setText(configFile['jPlus']['LD']['YR'])
+    component.setText(layoutDetails['YR'])
 
     component = PSE.getComponentByName(frame, 'useExtended')
-    component.setSelected(configFile['jPlus']['LD']['EH'])
+    component.setSelected(layoutDetails['EH'])
 
     updateYearModeled()
 
@@ -150,23 +150,32 @@ def addExtendedDataToManifest(reportName):
 
     reportPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
     report = PSE.loadJson(PSE.genericReadReport(reportPath))
-    report.update({'railroad':_getExtendedRailroadName()})
+    addExtendedDataToReport(report)
 
     PSE.genericWriteReport(reportPath, PSE.dumpJson(report))
 
     return
 
+def addExtendedDataToReport(report):
+    """
+    Add the jPlus contribution to a json report already in memory.
+    """
+
+    report.update({'railroad':_getExtendedRailroadName()})
+
+    return report
+
 def _getExtendedRailroadName():
     """
     Returns either the extended railroad name or the JMRI railroad name.
     """
 
-    configFile = PSE.readConfigFile()
+    layoutDetails = PSE.readConfigFile('jPlus')['LD']
     OSU = PSE.JMRI.jmrit.operations.setup
     
     railroadName = OSU.Setup.getRailroadName()
-    if configFile['jPlus']['LD']['EH']:
-        railroadName = configFile['jPlus']['LD']['JN']
+    if layoutDetails['EH']:
+        railroadName = layoutDetails['JN']
 
     return railroadName
 
@@ -234,10 +243,10 @@ def updateYearModeled():
 
     _psLog.debug('updateYearModeled')
 
-    configFile = PSE.readConfigFile()
+    layoutDetails = PSE.readConfigFile('jPlus')['LD']
 
     OSU = PSE.JMRI.jmrit.operations.setup
-    OSU.Setup.setYearModeled(configFile['jPlus']['LD']['YR'])
+    OSU.Setup.setYearModeled(layoutDetails['YR'])
 
     PSE.JMRI.jmrit.operations.setup.OperationsSettingsPanel().savePreferences()
 
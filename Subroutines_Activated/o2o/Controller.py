@@ -17,6 +17,8 @@ from Subroutines_Activated.o2o import View
 SCRIPT_NAME = '{}.{}'.format(PSE.SCRIPT_DIR, __name__)
 SCRIPT_REV = 20231001
 
+SUBSCRIBED_PROPERTIES = ['TrainBuilt', 'opsSwitchList']
+
 _psLog = PSE.LOGGING.getLogger('OPS.o2o.Controller')
 
 def getSubroutineDropDownItem():
@@ -54,10 +56,6 @@ class TrainsPropertyParser:
     
     def preProcess(self):
 
-        if self.propertyName == 'TrainBuilt' and self.newValue == True:
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
-                PSE.extendManifest(self.propertySource) # The train object is passed in
-
         return
     
     def process(self):
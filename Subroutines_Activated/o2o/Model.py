@@ -55,7 +55,7 @@ def removeSubroutineListeners():
 
 def getOpsSwitchList():
 
-    reportName = PSE.readConfigFile()['Main Script']['US']['OSL'].format('OPS', 'json')
+    reportName = PSE.readConfigFile('Main Script')['US']['OSL'].format('OPS', 'json')
     workListPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
     workList = PSE.loadJson(PSE.genericReadReport(workListPath))
 
@@ -252,7 +252,7 @@ def _updateJmriProperties():
 # Set the scale
     try:
         layoutScale = tpRailroadData['Extended_scale']
-        OSU.Setup.setScale(PSE.readConfigFile()['Main Script']['SR'][layoutScale])
+        OSU.Setup.setScale(PSE.readConfigFile('Main Script')['SR'][layoutScale])
     except:
         pass
 
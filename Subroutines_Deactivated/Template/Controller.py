@@ -17,6 +17,10 @@ from Subroutines_Activated.Template import View
 SCRIPT_NAME = '{}.{}'.format(PSE.SCRIPT_DIR, __name__)
 SCRIPT_REV = 20231001
 
+# List the train property names TrainsPropertyParser acts on.
+# PluginListeners only dispatches these, leave SUBSCRIBED_PROPERTIES out to get every event.
+SUBSCRIBED_PROPERTIES = []
+
 _psLog = PSE.LOGGING.getLogger('OPS.XX.Controller')
 
 
@@ -41,6 +45,16 @@ def getSubroutineDropDownItem():
     return menuItem
 
 
+def extendTrainManifest(manifest):
+    """
+    Add this subroutines' contribution to the extended manifest of a built train.
+    manifest is changed in place, PluginListeners writes it once all the subroutines are done.
+    Delete this function if there is nothing to add.
+    """
+
+    return
+
+
 class TrainsPropertyParser:
     """
     What gets called when any of three listeners are fired:
@@ -58,10 +72,6 @@ class TrainsPropertyParser:
     
     def preProcess(self):
 
-        if self.propertyName == 'TrainBuilt' and self.newValue == True:
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
-                PSE.extendManifest(self.propertySource) # The train object is passed in
-
         return
     
     def process(self):
@@ -113,7 +113,9 @@ def setupBundle():
 
 # Plugin bundle stuff
     makeDefaultPluginBundle()
-    PSE.BUNDLE = getBundleForLocale()
+    PSE.BUNDLE = PSE.FrozenBundle(getBundleForLocale())
+    PSE.BUNDLE_MISSES.clear()
+    PSE.LOAD_TYPE_LETTERS = {}
 # Help bundle stuff
     CreateStubFile().make()
     makeDefaultHelpFile() # Default help file is in english
@@ -41,6 +41,8 @@ class PluginGUI:
         self._makeScrollPanel()
         self._makePatternScriptsGUI()
 
+        PSE.indexFrameComponents(self.psFrame)
+
         return
 
     def _makeSubroutinesPanel(self):
@@ -92,7 +94,7 @@ class PluginGUI:
 
         if len(self.configFile['Main Script']['SL']) != 0: # Catches all subroutines deactivated
             menuText = PSE.getBundleItem('Extended reports on')
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
+            if PSE.readConfigFile('Main Script')['CP']['ER']:
                 menuText = PSE.getBundleItem('Extended reports off')
                 
             self.itemText = menuText
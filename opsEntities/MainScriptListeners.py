@@ -3,6 +3,7 @@ Listeners attached to the Main Script.
 """
 
 from opsEntities import PSE
+from opsEntities import PluginListeners
 from opsBundle import Bundle
 
 SCRIPT_NAME = '{}.{}'.format(PSE.SCRIPT_DIR, __name__)
@@ -88,6 +89,8 @@ def ecItemSelected(OPEN_EC_EVENT):
 
     _psLog.debug(OPEN_EC_EVENT)
 
+    PSE.flushConfigFile()
+
     configTarget = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'configFile.json')
 
     PSE.genericDisplayReport(configTarget)
@@ -107,6 +110,7 @@ def rsItemSelected(RESTART_PLUGIN_EVENT):
     PSE.closeWindowByName('TitleOutputFrame')
 
     PSE.deleteConfigFile()
+    PluginListeners.clearSubroutineRegistry()
 
     PSE.IM('MainScript').makePsPlugin()
 
@@ -17,6 +17,8 @@ from importlib import import_module as IM # Called by the listeners
 import logging as LOGGING
 import apps as APPS
 import time as TIME
+import copy as COPY
+import threading as THREADING
 # from HTMLParser import HTMLParser as HTML_PARSER
 from json import loads as jsonLoadS, dumps as jsonDumpS
 from codecs import open as codecsOpen
@@ -29,7 +31,7 @@ Ghost imports from MainScript:
     PSE.JMRI = jmri
     PSE.SYS = sys
     PSE.OS_PATH = OS_PATH
-    PSE.BUNDLE = mainScript/handle/Bundle.getBundleForLocale()
+    PSE.BUNDLE = mainScript/handle/Bundle.setupBundle()
     PSE.ENCODING = PSE.readConfigFile('Main Script')['CP']['SE']
 Ghost imports from Bundle:
     PSE.BUNDLE_DIR = PSE.OS_PATH.join(PSE.PLUGIN_ROOT, 'opsBundle')
@@ -41,8 +43,15 @@ SCRIPT_NAME = 'OperationsPatternScripts.opsEntities.PSE'
 SCRIPT_REV = 20231001
 PROFILE_PATH = JMRI.util.FileUtil.getProfilePath()
 BUNDLE = {}
+BUNDLE_MISSES = {}
 REPORT_ITEM_WIDTH_MATRIX = {}
+LINE_FORMATS = {}
+LOAD_TYPE_LETTERS = {}
+TRAIN_MANIFESTS = {}
 ROSETTA = {}
+COMPONENT_INDEX = {}
+DEFAULT_SEQUENCE = 6000
+SHUT_DOWN_TASK = None
 TRACK_NAME_CLICKED_ON = ''
 
 # Don't use this: J_BUNDLE = JMRI.jmrit.operations.setup.Setup()
@@ -153,17 +162,57 @@ def _logIndex():
 """Translation Functions"""
 
 
+class FrozenBundle(dict):
+    """
+    The plugin bundle with every translation decoded to unicode once.
+    Read only, Bundle.setupBundle makes a new one when the locale changes.
+    """
+
+    def __init__(self, bundle):
+
+        decoded = {}
+        for item, translation in bundle.items():
+            if not isinstance(translation, unicode):
+                translation = unicode(translation, ENCODING)
+            decoded[item] = translation
+
+        dict.__init__(self, decoded)
+
+    def _readOnly(self, *args, **kwargs):
+
+        raise TypeError('The plugin bundle is read only')
+
+    __setitem__ = __delitem__ = _readOnly
+    clear = pop = popitem = setdefault = update = _readOnly
+
+
 def getBundleItem(item):
     """
     Centralized function for translation.
     Retrieves the item from the bundle.
+    Missing items are counted in BUNDLE_MISSES.
     """
 
     try:
-        return unicode(BUNDLE[item], ENCODING)
+        return BUNDLE[item]
     except KeyError:
+        BUNDLE_MISSES[item] = BUNDLE_MISSES.get(item, 0) + 1
         return ''
 
+def logBundleMisses():
+    """
+    Writes the bundle items that were asked for but not found to the log.
+    Called by:
+    PluginListeners.PatternScriptsFrameListener.windowClosing
+    """
+
+    for item, count in sorted(BUNDLE_MISSES.items()):
+        _psLog.warning(u'Bundle item not found: {}, requested {} times'.format(item, count))
+
+    BUNDLE_MISSES.clear()
+
+    return
+
 
 """GUI Functions"""
 
@@ -249,37 +298,85 @@ def repaintPatternScriptsFrame():
 
 def getComponentByName(frameTitle, componentName):
     """
-    Gets a frame by title.
-    Searches a frame for a component by name.
-    Uses crawler() to find a component in a frame.
+    Gets a frame by title, or takes the frame itself.
+    Looks up a component in the frame by name using COMPONENT_INDEX.
+    The frame is re-indexed if the component is not found or is no longer in the frame.
     Assumes that each component has a unique name.
     """
 
-    global CRAWLER
-    CRAWLER = []
-    frame = JMRI.util.JmriJFrame.getFrame(frameTitle)
+    if isinstance(frameTitle, JAVA_AWT.Window):
+        frame = frameTitle
+    else:
+        frame = JMRI.util.JmriJFrame.getFrame(frameTitle)
 
-    crawler(frame)
+    if not frame:
+        print(componentName + ' not found in ' + unicode(frameTitle))
+        return
 
-    if len(CRAWLER) == 0:
-        print(componentName + ' not found in ' + frameTitle)
+    if not frame.isDisplayable():
+        forgetFrameComponents(frame)
         return
 
-    for component in CRAWLER:
-        if component.getName() == componentName:
-            return component
+    component = COMPONENT_INDEX.get(frame.getTitle(), {}).get(componentName)
+    if component and JAVX_SWING.SwingUtilities.getWindowAncestor(component) == frame:
+        return component
+
+    return indexFrameComponents(frame).get(componentName)
+
+def indexFrameComponents(frame):
+    """
+    Indexes all the named components in a frame by name.
+    The index is kept in COMPONENT_INDEX under the frame title.
+    Called by:
+    GUI.PluginGUI
+    Patterns.Model.makeTrackRows
+    """
+
+    componentIndex = {}
+    _indexComponents(frame, componentIndex)
+    COMPONENT_INDEX[frame.getTitle()] = componentIndex
+
+    return componentIndex
+
+def forgetFrameComponents(frame):
+    """
+    Drops a frame's entry from COMPONENT_INDEX so a closed frame's components are not held.
+    Called by:
+    closeWindowByName
+    PluginListeners.PatternScriptsFrameListener.windowClosing
+    """
+
+    COMPONENT_INDEX.pop(frame.getTitle(), None)
+
+    return
+
+def _indexComponents(container, componentIndex):
+    """
+    Recursively adds the components in a container to componentIndex.
+    The first component found with a name keeps it.
+    """
+
+    for component in container.getComponents():
+        componentName = component.getName()
+        if componentName and componentName not in componentIndex:
+            componentIndex[componentName] = component
+
+        _indexComponents(component, componentIndex)
 
     return
 
-def crawler(frame):
+def _findComponentByClass(container, componentClass):
     """
-    Recursively returns all the components in a frame.
+    Recursively finds the first component of a class in a container.
     """
 
-    for component in frame.getComponents():
-        CRAWLER.append(component)
+    for component in container.getComponents():
+        if component.getClass() == componentClass:
+            return component
 
-        crawler(component)
+        found = _findComponentByClass(component, componentClass)
+        if found:
+            return found
 
     return
 
@@ -308,13 +405,9 @@ def openOutputFrame(message):
     frame = JMRI.util.JmriJFrame.getFrame(frameName)
     LM.addPropertyChangeListener(ListenToThePSWindow(frame))
 
-    global CRAWLER
-    CRAWLER = []
-    crawler(frame)
-    for component in CRAWLER:
-        if component.getClass() == JAVX_SWING.JTextArea:
-           component.text += u'{}\n'.format(message)
-           break
+    component = _findComponentByClass(frame, JAVX_SWING.JTextArea)
+    if component:
+        component.text += u'{}\n'.format(message)
 
     return
 
@@ -327,6 +420,7 @@ def closeWindowByName(windowName):
         if frame.getName() == windowName:
             JWE = JAVA_AWT.event.WindowEvent
             frame.dispatchEvent(JWE(frame, JWE.WINDOW_CLOSING))
+            forgetFrameComponents(frame)
             frame.dispose()
 
     return
@@ -357,6 +451,7 @@ def closeWindowByLevel(level=None):
         else:
             # frame.setVisible(False)
             frame.dispatchEvent(JWE(frame, JWE.WINDOW_CLOSING))
+            forgetFrameComponents(frame)
             frame.dispose()
 
     return
@@ -403,19 +498,42 @@ def occuranceTally(listOfOccurances):
     """
     Tally the occurances of a word in a list and return a dictionary.
     Home grown version of collections.Counter.
+    The list is not changed.
+    """
+
+    tally = {}
+    for occurance in listOfOccurances:
+        tally[occurance] = tally.get(occurance, 0) + 1
+
+    return tally
+
+def occuranceSubtotals(groupedOccurances):
+    """
+    groupedOccurances is a list of (group, occurance) tuples, like (track name, final destination).
+    Returns the tally over all groups and a dictionary of tallies by group.
+    Called by:
+    TextReports._patternReportLines
     """
 
-    dict = {}
-    while len(listOfOccurances):
-        occurance = listOfOccurances[-1]
-        tally = 0
-        for i in xrange(len(listOfOccurances) - 1, -1, -1): # run list from bottom up
-            if listOfOccurances[i] == occurance:
-                tally += 1
-                listOfOccurances.pop(i)
-        dict[occurance] = tally
+    totals = {}
+    subtotals = {}
+    for group, occurance in groupedOccurances:
+        totals[occurance] = totals.get(occurance, 0) + 1
+        groupTally = subtotals.setdefault(group, {})
+        groupTally[occurance] = groupTally.get(occurance, 0) + 1
 
-    return dict
+    return totals, subtotals
+
+def getRsSequence(rs):
+    """
+    The Scanner sequence number is stored in the rolling stock value field as a string.
+    Returns it as an int, or DEFAULT_SEQUENCE if the value is not a number.
+    """
+
+    try:
+        return int(rs.getValue())
+    except (ValueError, TypeError):
+        return DEFAULT_SEQUENCE
 
 def getAllDivisionNames():
     """
@@ -441,11 +559,11 @@ def getAllLocationNames():
 
 def getSortList(rsSort):
     """
-    Returns PSE.readConfigFile()['Patterns']['US'][rsSort] as a sorted list.
+    Returns PSE.readConfigFile('Patterns')['US'][rsSort] as a sorted list.
     """
 
     try:
-        sortList = [(a, b) for a, b in readConfigFile()['Patterns']['US'][rsSort].items() if b != 0]
+        sortList = [(a, b) for a, b in readConfigFile('Patterns')['US'][rsSort].items() if b != 0]
         sortList.sort(key=lambda row: row[1])
         sortList = [item[0] for item in sortList]
     except:
@@ -453,14 +571,102 @@ def getSortList(rsSort):
 
     return sortList
 
+def compileSortKey(sortList):
+    """
+    Compiles a list of sort items into one key function that returns a tuple, so a list is sorted once.
+    An item like 'location track' reads row['location']['track'].
+    Matches the repeated stable sorts it replaces, where the last item in sortList is the primary key.
+    Values are compared as stored, so numeric items like 'sequence' must be stored as ints.
+    Called by:
+    Patterns.ModelEntities.ParseRollingStock
+    TRE.sortWorkOrder
+    TRE.getOpsTrainList
+    """
+
+    extractors = [_makeSortItemExtractor(sortItem) for sortItem in reversed(sortList)]
+
+    def sortKey(row):
+
+        return tuple([extractor(row) for extractor in extractors])
+
+    return sortKey
+
+def _makeSortItemExtractor(sortItem):
+    """
+    Helper function for compileSortKey().
+    A nested item that can't be read falls back to its top level item.
+    """
+
+    keys = sortItem.split()
+    topKey = keys[0]
+    if len(keys) == 1:
+        return lambda row: row[topKey]
+
+    nestedKeys = keys[1:]
+
+    def extractor(row):
+
+        try:
+            value = row[topKey]
+            for key in nestedKeys:
+                value = value[key]
+            return value
+        except (KeyError, IndexError, TypeError):
+            return row[topKey]
+
+    return extractor
+
 def getTrainManifest(trainName):
+    """
+    Returns a copy of train-<trainName>.json.
+    The last manifest written by putTrainManifest is served from memory
+    until JMRI rewrites the file.
+    """
+
+    manifestPath = _getTrainManifestPath(trainName)
+    fingerprint = _getFileFingerprint(manifestPath)
+
+    try:
+        cachedFingerprint, manifest = TRAIN_MANIFESTS[trainName]
+        if cachedFingerprint == fingerprint:
+            return COPY.deepcopy(manifest)
+    except KeyError:
+        pass
 
-    trainName = u'train-{}.json'.format(trainName)
-    manifestPath = OS_PATH.join(PROFILE_PATH, 'operations', 'jsonManifests', trainName)
     manifest = loadJson(genericReadReport(manifestPath))
+    TRAIN_MANIFESTS[trainName] = (fingerprint, COPY.deepcopy(manifest))
 
     return manifest
 
+def putTrainManifest(trainName, manifest):
+    """
+    Writes train-<trainName>.json and keeps a copy for getTrainManifest.
+    """
+
+    manifestPath = _getTrainManifestPath(trainName)
+    genericWriteReport(manifestPath, dumpJson(manifest))
+    TRAIN_MANIFESTS[trainName] = (_getFileFingerprint(manifestPath), COPY.deepcopy(manifest))
+
+    return
+
+def _getTrainManifestPath(trainName):
+    """
+    Helper function for getTrainManifest() and putTrainManifest()
+    """
+
+    trainName = u'train-{}.json'.format(trainName)
+
+    return OS_PATH.join(PROFILE_PATH, 'operations', 'jsonManifests', trainName)
+
+def _getFileFingerprint(filePath):
+    """
+    A file is taken as unchanged if its modified time and size are unchanged.
+    """
+
+    targetFile = JAVA_IO.File(filePath)
+
+    return (targetFile.lastModified(), targetFile.length())
+
 def convertIsoToValidTime(isoDate):
     """
     Convert ISO time generated by JMRI or OPS into the JMRI standard date time.
@@ -560,16 +766,14 @@ def findLongestStringLength(list):
 
     return longestString
 
-def extendManifest(trainObject):
+def extendManifest(trainObject, report):
     """
     Adds additional attributes found in the print options dialog.
-    Called by all the subroutines.
+    report is the JMRI manifest for trainObject, it is extended in place.
+    Called by:
+    PluginListeners.extendTrainManifest
     """
 
-    reportName = u'train-{}.json'.format(trainObject.toString())
-    reportPath = OS_PATH.join(PROFILE_PATH, 'operations', 'jsonManifests', reportName)
-    report = loadJson(genericReadReport(reportPath))
-
     trainRoute = trainObject.getRoute()
     routeLocations = trainRoute.getLocationsBySequenceList()
     OSU = JMRI.jmrit.operations.setup
@@ -580,52 +784,116 @@ def extendManifest(trainObject):
     report['description'] = trainObject.getDescription()
     report['comment'] = trainObject.getComment()
 
+    snapshot = RollingStockSnapshot()
+
     i = 0
     for location in report['locations']:
         locationName = routeLocations[i].toString()
-        divisionName = LM.getLocationByName(locationName).getDivisionName()
+        divisionName = snapshot.getDivisionName(locationName)
         location['userName'] = locationName
         location['division'] = {'userName':divisionName}
         i += 1
 
     # Engines
-        for loco in location['engines']['add']:
-            locoObject = EM.getByRoadAndNumber(loco['road'], loco['number'])
-            loco['dccAddress'] = locoObject.getDccAddress()
-
-        for loco in location['engines']['remove']:
-            locoObject = EM.getByRoadAndNumber(loco['road'], loco['number'])
-            loco['dccAddress'] = locoObject.getDccAddress()
+        for loco in location['engines']['add'] + location['engines']['remove']:
+            loco['dccAddress'] = snapshot.getLoco(loco['road'], loco['number'])['dccAddress']
     # Cars
-        for car in location['cars']['add']:
-            carObject = CM.getByRoadAndNumber(car['road'], car['number'])
-            kSize = 0
-            kernelName = carObject.getKernelName()
-            if kernelName:
-                kSize = KM.getKernelByName(kernelName).getSize()
-            car['kernelSize'] = kSize
-            car['finalDestination']={'userName':carObject.getFinalDestinationName(), 'track':{'userName':carObject.getFinalDestinationTrackName()}}
-            car['loadType'] = carObject.getLoadType()
-            car['division'] = LM.getLocationByName(car['location']['userName']).getDivisionName()
-            car['sequence'] = '6000'
+        for car in location['cars']['add'] + location['cars']['remove']:
+            carSnapshot = snapshot.getCar(car['road'], car['number'])
+            car['kernelSize'] = carSnapshot['kernelSize']
+            car['finalDestination'] = {'userName':carSnapshot['finalDestinationName'], 'track':{'userName':carSnapshot['finalDestinationTrackName']}}
+            car['loadType'] = carSnapshot['loadType']
+            car['division'] = snapshot.getDivisionName(car['location']['userName'])
+            car['sequence'] = DEFAULT_SEQUENCE
             addIsLocal(car)
 
-        for car in location['cars']['remove']:
-            carObject = CM.getByRoadAndNumber(car['road'], car['number'])
-            kSize = 0
-            kernelName = carObject.getKernelName()
+    return report
+
+
+class RollingStockSnapshot:
+    """
+    Snapshot of the engine and car rosters taken when a train is built.
+    Made with one sweep of EM.getList(), CM.getList() and LM.getList(),
+    keyed by (road, number) so each manifest entry is one dictionary lookup.
+    Rolling stock not in the snapshot falls back to the JMRI managers.
+    """
+
+    def __init__(self):
+
+        self.locos = {}
+        self.cars = {}
+        self.divisions = {}
+
+        kernelSizes = {}
+
+        for loco in EM.getList():
+            self.locos[(loco.getRoadName(), loco.getNumber())] = self._getLocoAttributes(loco)
+
+        for car in CM.getList():
+            kernelName = car.getKernelName()
             if kernelName:
-                kSize = KM.getKernelByName(kernelName).getSize()
-            car['kernelSize'] = kSize
-            car['finalDestination']={'userName':carObject.getFinalDestinationName(), 'track':{'userName':carObject.getFinalDestinationTrackName()}}
-            car['loadType'] = carObject.getLoadType()
-            car['division'] = LM.getLocationByName(car['location']['userName']).getDivisionName()
-            car['sequence'] = '6000'
-            addIsLocal(car)
+                kernelSizes[kernelName] = kernelSizes.get(kernelName, 0) + 1
+            self.cars[(car.getRoadName(), car.getNumber())] = self._getCarAttributes(car)
 
-    genericWriteReport(reportPath, dumpJson(report))
+        for carAttributes in self.cars.values():
+            carAttributes['kernelSize'] = kernelSizes.get(carAttributes['kernelName'], 0)
+
+        for location in LM.getList():
+            self.divisions[location.getName()] = location.getDivisionName()
+
+        return
+
+    def _getLocoAttributes(self, locoObject):
+
+        locoAttributes = {}
+        locoAttributes['dccAddress'] = locoObject.getDccAddress()
+
+        return locoAttributes
+
+    def _getCarAttributes(self, carObject):
+
+        carAttributes = {}
+        carAttributes['kernelName'] = carObject.getKernelName()
+        carAttributes['kernelSize'] = 0
+        carAttributes['finalDestinationName'] = carObject.getFinalDestinationName()
+        carAttributes['finalDestinationTrackName'] = carObject.getFinalDestinationTrackName()
+        carAttributes['loadType'] = carObject.getLoadType()
+
+        return carAttributes
+
+    def getLoco(self, road, number):
+
+        try:
+            return self.locos[(road, number)]
+        except KeyError:
+            locoAttributes = self._getLocoAttributes(EM.getByRoadAndNumber(road, number))
+            self.locos[(road, number)] = locoAttributes
+
+            return locoAttributes
+
+    def getCar(self, road, number):
+
+        try:
+            return self.cars[(road, number)]
+        except KeyError:
+            carObject = CM.getByRoadAndNumber(road, number)
+            carAttributes = self._getCarAttributes(carObject)
+            if carAttributes['kernelName']:
+                carAttributes['kernelSize'] = KM.getKernelByName(carAttributes['kernelName']).getSize()
+            self.cars[(road, number)] = carAttributes
+
+            return carAttributes
+
+    def getDivisionName(self, locationName):
+
+        try:
+            return self.divisions[locationName]
+        except KeyError:
+            divisionName = LM.getLocationByName(locationName).getDivisionName()
+            self.divisions[locationName] = divisionName
+
+            return divisionName
 
-    return
 
 def addIsLocal(rs):
     """
@@ -684,6 +952,22 @@ def genericReadReport(filePath):
 
     return genericReport
 
+def genericReadReportLines(filePath):
+    """
+    Yields the lines of a text file one at a time, without the line ending.
+    Called by:
+    Scanner.Model.applyRfidData
+    """
+
+    try:
+        ENCODING
+    except UnboundLocalError:
+        ENCODING = 'utf-8'
+
+    with codecsOpen(filePath, 'r', encoding=ENCODING) as textWorkFile:
+        for line in textWorkFile:
+            yield line.rstrip('\r\n')
+
 def genericWriteReport(filePath, genericReport):
     """
     Called by everything
@@ -699,6 +983,49 @@ def genericWriteReport(filePath, genericReport):
 
     return
 
+def genericWriteReportLines(filePath, reportLines):
+    """
+    Writes an iterable of text lines to filePath one at a time,
+    so a large report never has to be held as a single string.
+    Called by:
+    TextReports._renderReport
+    """
+
+    try:
+        ENCODING
+    except UnboundLocalError:
+        ENCODING = 'utf-8'
+
+    with codecsOpen(filePath, 'wb', encoding=ENCODING) as textWorkFile:
+        for line in reportLines:
+            textWorkFile.write(line)
+
+    return
+
+def genericWriteReportAtomic(filePath, genericReport):
+    """
+    Writes to a temp file next to filePath, forces it to disk, then renames it over filePath.
+    A crash mid-write leaves either the old or the new file, never a truncated one.
+    """
+
+    tempPath = filePath + '.tmp'
+    genericWriteReport(tempPath, genericReport)
+
+    tempStream = JAVA_IO.FileOutputStream(tempPath, True)
+    try:
+        tempStream.getChannel().force(True)
+    finally:
+        tempStream.close()
+
+    copyFrom = JAVA_IO.File(tempPath).toPath()
+    copyTo = JAVA_IO.File(filePath).toPath()
+    try:
+        JAVA_NIO.Files.move(copyFrom, copyTo, JAVA_NIO.StandardCopyOption.ATOMIC_MOVE, JAVA_NIO.StandardCopyOption.REPLACE_EXISTING)
+    except JAVA_NIO.AtomicMoveNotSupportedException:
+        JAVA_NIO.Files.move(copyFrom, copyTo, JAVA_NIO.StandardCopyOption.REPLACE_EXISTING)
+
+    return
+
 def genericDisplayReport(genericReportPath):
 
     targetFile = JAVA_IO.File(genericReportPath)
@@ -810,30 +1137,324 @@ def mergeConfigFiles():
 
 def readConfigFile(subConfig=None):
     """
-    checkConfigFile will return the config file if it's ok or a new one otherwise.
+    CONFIG_STORE will return the config file if it's ok or a new one otherwise.
     Called by everything.
     """
 
-    configFile = checkConfigFile()
-
-    if not subConfig:
-        return configFile
-    else:
-        return configFile[subConfig]
+    return CONFIG_STORE.read(subConfig)
 
 def checkConfigFile():
+    """
+    Forces CONFIG_STORE to reparse configFile.json.
+    """
 
-    fileName = 'configFile.json'
-    targetPath = OS_PATH.join(PROFILE_PATH, 'operations', fileName)
+    CONFIG_STORE.invalidate()
 
-    try:
-        loadJson(genericReadReport(targetPath))
-    except:
-        makeNewConfigFile()
-        print('Exception at: PSE.checkConfigFile')
-        print('Using new configFile')
+    return CONFIG_STORE.read()
+
+
+class ConfigStore:
+    """
+    Process wide, in memory copy of configFile.json.
+    The file is parsed once and reparsed only when its modified time or size changes,
+    IE after the user edits it with Tools/Edit Config File.
+    The file is checked for changes at most once every STAT_INTERVAL seconds.
+    Sections changed by writeConfigFile are tracked and written back in one flush.
+    Bursts of writes are coalesced, the flush runs on a background timer FLUSH_DELAY seconds after the last write.
+    Callers get a copy, so an edit is not seen by anyone until it is written.
+    Callers that only need one section should ask for it, only that section is copied.
+    Whole config reads are left to callers that edit and write back more than one section,
+    and to the one time reads made when the plugin or a subroutine is built.
+    """
+
+    FLUSH_DELAY = 2.0
+    STAT_INTERVAL = 1.0
+
+    def __init__(self):
+
+        self.configFile = None
+        self.fingerprint = None
+        self.checkedAt = 0.0
+        self.dirtySections = set()
+        self.flushTimer = None
+        self.lock = THREADING.RLock()
+
+        return
+
+    def _getTargetPath(self):
+
+        return OS_PATH.join(PROFILE_PATH, 'operations', 'configFile.json')
+
+    def _getFingerprint(self):
+
+        return _getFileFingerprint(self._getTargetPath())
+
+    def isStale(self):
+        """
+        True if the file on disk is not the one held in memory.
+        Pending writes make the memory copy the newer one.
+        """
+
+        if self.configFile is None:
+            return True
+
+        if self.dirtySections:
+            return False
+
+        now = TIME.time()
+        if now - self.checkedAt < self.STAT_INTERVAL:
+            return False
+
+        self.checkedAt = now
+
+        return self._getFingerprint() != self.fingerprint
+
+    def invalidate(self):
+
+        with self.lock:
+            self._cancelFlush()
+            self.configFile = None
+            self.fingerprint = None
+            self.dirtySections = set()
+
+        return
+
+    def load(self):
+        """
+        Try/except catches a missing or defective file.
+        """
+
+        targetPath = self._getTargetPath()
+
+        with self.lock:
+            try:
+                configFile = loadJson(genericReadReport(targetPath))
+            except:
+                makeNewConfigFile()
+                self.flush()
+                print('Exception at: PSE.ConfigStore.load')
+                print('Using new configFile')
+                configFile = loadJson(genericReadReport(targetPath))
+
+            self.configFile = configFile
+            self.fingerprint = self._getFingerprint()
+            self.checkedAt = TIME.time()
+            self.dirtySections = set()
+
+            _psLog.debug('configFile.json loaded into the config store')
+
+        return
+
+    def read(self, subConfig=None):
+
+        with self.lock:
+            if self.isStale():
+                self.load()
+
+            if not subConfig:
+                return COPY.deepcopy(self.configFile)
+            else:
+                return COPY.deepcopy(self.configFile[subConfig])
+
+    def write(self, configFile):
+        """
+        Only the sections that differ from the stored copy are marked dirty.
+        If the file was changed on disk since it was read, every section is dirty.
+        """
+
+        with self.lock:
+            if self.isStale():
+                self.dirtySections.update(configFile.keys())
+            else:
+                for section, value in configFile.items():
+                    if self.configFile.get(section) != value:
+                        self.dirtySections.add(section)
+                for section in self.configFile.keys():
+                    if section not in configFile:
+                        self.dirtySections.add(section)
+
+            self.configFile = COPY.deepcopy(configFile)
+            if self.dirtySections:
+                self._scheduleFlush()
+
+        return
+
+    def _scheduleFlush(self):
+        """
+        Each write restarts the timer, so a burst of writes costs one flush.
+        """
+
+        self._cancelFlush()
+        self.flushTimer = THREADING.Timer(self.FLUSH_DELAY, self.flush)
+        self.flushTimer.setDaemon(True)
+        self.flushTimer.start()
+
+        return
+
+    def _cancelFlush(self):
+
+        if self.flushTimer:
+            self.flushTimer.cancel()
+            self.flushTimer = None
+
+        return
+
+    def flush(self):
+        """
+        Writes the stored copy to disk if any section is dirty.
+        The write is atomic, a crash mid-write leaves the previous file intact.
+        PluginShutDownTask calls this when JMRI quits, so a pending timer is not lost.
+        """
+
+        with self.lock:
+            self._cancelFlush()
+            if not self.dirtySections:
+                return
+
+            genericWriteReportAtomic(self._getTargetPath(), dumpJson(self.configFile))
+
+            self.fingerprint = self._getFingerprint()
+            _psLog.debug('configFile.json sections written: ' + ', '.join(sorted(self.dirtySections)))
+            self.dirtySections = set()
+
+        return
+
+
+CONFIG_STORE = ConfigStore()
 
-    return loadJson(genericReadReport(targetPath))
+
+class PluginShutDownTask(JMRI.implementation.AbstractShutDownTask):
+    """
+    Writes anything the plugin is holding back when JMRI quits,
+    including when the plugin window was never closed.
+    """
+
+    def run(self):
+        """
+        JMRI may run this off the EDT, nothing else edits the rosters by then.
+        """
+
+        flushConfigFile()
+        flushRosters()
+
+        return
+
+    def execute(self):
+        """
+        JMRI v4 calls execute instead of run.
+        """
+
+        self.run()
+
+        return True
+
+def registerShutDownTask():
+    """
+    Registered once per JMRI session.
+    Called by:
+    MainScript.Controller.handle
+    """
+
+    global SHUT_DOWN_TASK
+
+    if SHUT_DOWN_TASK:
+        return
+
+    SHUT_DOWN_TASK = PluginShutDownTask('OPS Pattern Scripts')
+    JMRI.InstanceManager.getDefault(JMRI.ShutDownManager).register(SHUT_DOWN_TASK)
+
+    return
+
+
+class RosterSaver:
+    """
+    Deferred saves of the JMRI car and engine rosters.
+    Each save writes a whole roster xml file, so changes are marked here
+    and the files are written once, SAVE_DELAY seconds after the last change,
+    when the plugin window closes or when JMRI quits.
+    The timer is a Swing timer, so the save runs on the EDT with the other roster edits.
+    """
+
+    SAVE_DELAY = 5.0
+
+    def __init__(self):
+
+        self.dirtyRosters = set()
+        self.lock = THREADING.RLock()
+
+        self.saveTimer = JAVX_SWING.Timer(int(self.SAVE_DELAY * 1000), self.timerAction)
+        self.saveTimer.setRepeats(False)
+
+        return
+
+    def markDirty(self, cars=False, engines=False):
+
+        with self.lock:
+            if cars:
+                self.dirtyRosters.add('cars')
+            if engines:
+                self.dirtyRosters.add('engines')
+
+            if self.dirtyRosters:
+                self._scheduleSave()
+
+        return
+
+    def _scheduleSave(self):
+        """
+        Each change restarts the timer, so a burst of changes costs one save.
+        """
+
+        self.saveTimer.restart()
+
+        return
+
+    def timerAction(self, ACTION_PERFORMED):
+
+        self.flush()
+
+        return
+
+    def flush(self):
+
+        with self.lock:
+            self.saveTimer.stop()
+            if not self.dirtyRosters:
+                return
+
+            if 'engines' in self.dirtyRosters:
+                EMX.save()
+            if 'cars' in self.dirtyRosters:
+                CMX.save()
+
+            _psLog.debug('Rosters saved: ' + ', '.join(sorted(self.dirtyRosters)))
+            self.dirtyRosters = set()
+
+        return
+
+
+ROSTER_SAVER = RosterSaver()
+
+def saveRosters(cars=False, engines=False):
+    """
+    Marks the car and/or engine roster as changed, the save is deferred.
+    """
+
+    ROSTER_SAVER.markDirty(cars, engines)
+
+    return
+
+def flushRosters():
+    """
+    Writes any changed roster now.
+    Called by:
+    PluginListeners.PatternScriptsFrameListener.windowClosing
+    PluginShutDownTask.run
+    """
+
+    ROSTER_SAVER.flush()
+
+    return
 
 def makeNewConfigFile():
     """
@@ -910,10 +1531,21 @@ def writeConfigFile(configFile):
     Called by everything.
     """
 
-    fileName = 'configFile.json'
-    targetPath = OS_PATH.join(PROFILE_PATH, 'operations', fileName)
-    targetFile = dumpJson(configFile)
-    genericWriteReport(targetPath, targetFile)
+    CONFIG_STORE.write(configFile)
+
+    return
+
+def flushConfigFile():
+    """
+    Writes any dirty sections of the config store to configFile.json now,
+    without waiting for the flush timer.
+    Called by:
+    PluginListeners.PatternScriptsFrameListener.windowClosing
+    MainScriptListeners.ecItemSelected
+    PluginShutDownTask.run
+    """
+
+    CONFIG_STORE.flush()
 
     return
 
@@ -923,6 +1555,8 @@ def deleteConfigFile():
     targetFile = OS_PATH.join(PROFILE_PATH, 'operations', fileName)
     JAVA_IO.File(targetFile).delete()
 
+    CONFIG_STORE.invalidate()
+
     return
 
 
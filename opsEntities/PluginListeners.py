@@ -12,6 +12,10 @@ SCRIPT_REV = 20231001
 
 _psLog = PSE.LOGGING.getLogger('OPS.OE.PluginListeners')
 
+SUBROUTINE_REGISTRY = None
+DISPATCH_TABLE = None
+DISPATCH_STATS = {}
+
 
 class PatternScriptsFrameListener(PSE.JAVA_AWT.event.WindowListener):
     """
@@ -31,9 +35,7 @@ class PatternScriptsFrameListener(PSE.JAVA_AWT.event.WindowListener):
 
         addSubroutineListeners()
 
-        for subroutine in PSE.getSubroutineDirs():
-            xModule = 'Subroutines_Activated.{}'.format(subroutine)
-            package = __import__(xModule, fromlist=['Model'], level=-1)
+        for package in getSubroutineRegistry():
             package.Model.initializeSubroutine()
             package.Model.addSubroutineListeners()
 
@@ -47,14 +49,17 @@ class PatternScriptsFrameListener(PSE.JAVA_AWT.event.WindowListener):
 
         _psLog.debug(WINDOW_CLOSING)
 
-        for subroutine in PSE.getSubroutineDirs():
-            xModule = 'Subroutines_Activated.{}'.format(subroutine)
-            package = __import__(xModule, fromlist=['Model'], level=-1)
+        for package in getSubroutineRegistry():
             package.Model.removeSubroutineListeners()
 
         removeSubroutineListeners()
+        logDispatchStats()
+        PSE.logBundleMisses()
         
         PSE.updateWindowParams(WINDOW_CLOSING.getSource())
+        PSE.forgetFrameComponents(WINDOW_CLOSING.getSource())
+        PSE.flushConfigFile()
+        PSE.flushRosters()
         PSE.removePSPropertyListeners()
 
         PSE.closeWindowByName('setCarsWindow')
@@ -108,29 +113,32 @@ class TrainsPropertyChange(PSE.JAVA_BEANS.PropertyChangeListener):
 
             return
 
+        manifest = None
+        if PROPERTY_CHANGE_EVENT.propertyName == 'TrainBuilt' and PROPERTY_CHANGE_EVENT.newValue == True:
+            if PSE.readConfigFile('Main Script')['CP']['ER']:
+                manifest = extendTrainManifest(PROPERTY_CHANGE_EVENT.source)
+
+        parsers = []
+        for package in getSubscribers(PROPERTY_CHANGE_EVENT.propertyName):
+            parser = package.Controller.TrainsPropertyParser(PROPERTY_CHANGE_EVENT)
+            parsers.append((package.__name__.split('.')[1], parser))
+
         _psLog.debug('PluginListeners.TrainsPropertyChange.TrainsPropertyParser.preProcess')
-        for subroutine in PSE.getSubroutineDirs():
-            xModule = 'Subroutines_Activated.{}'.format(subroutine)
-            package = __import__(xModule, fromlist=['Controller'], level=-1)
-            package.Controller.TrainsPropertyParser(PROPERTY_CHANGE_EVENT).preProcess()
+        for subroutineName, parser in parsers:
+            _timedDispatch(subroutineName, parser.preProcess)
 
         _psLog.debug('PluginListeners.TrainsPropertyChange.TrainsPropertyParser.process')
-        for subroutine in PSE.getSubroutineDirs():
-            xModule = 'Subroutines_Activated.{}'.format(subroutine)
-            package = __import__(xModule, fromlist=['Controller'], level=-1)
-            package.Controller.TrainsPropertyParser(PROPERTY_CHANGE_EVENT).process()
+        for subroutineName, parser in parsers:
+            _timedDispatch(subroutineName, parser.process)
 
         _psLog.debug('PluginListeners.TrainsPropertyChange.TrainsPropertyParser.postProcess')
-        for subroutine in PSE.getSubroutineDirs():
-            xModule = 'Subroutines_Activated.{}'.format(subroutine)
-            package = __import__(xModule, fromlist=['Controller'], level=-1)
-            package.Controller.TrainsPropertyParser(PROPERTY_CHANGE_EVENT).postProcess()
+        for subroutineName, parser in parsers:
+            _timedDispatch(subroutineName, parser.postProcess)
 
-        if PROPERTY_CHANGE_EVENT.propertyName == 'TrainBuilt' and PROPERTY_CHANGE_EVENT.newValue == True:
-            if PSE.readConfigFile()['Main Script']['CP']['ER']:
-                trainName = PROPERTY_CHANGE_EVENT.source.toString()
-                TextReports.printExtendedWorkOrder(trainName)
-                TextReports.printExtendedTrainList(trainName)
+        if manifest:
+            trainName = PROPERTY_CHANGE_EVENT.source.toString()
+            TextReports.printExtendedWorkOrder(trainName, PSE.COPY.deepcopy(manifest))
+            TextReports.printExtendedTrainList(trainName, PSE.COPY.deepcopy(manifest))
 
         return
 
@@ -146,30 +154,24 @@ class LocationsPropertyChange(PSE.JAVA_BEANS.PropertyChangeListener):
     
     def propertyChange(self, PROPERTY_CHANGE_EVENT):
 
-        jmriProperties = ['divisionsListLength', 'divisionName', 'locationsListLength', 'locationName', 'trackListLength', 'trackName']
+        jmriProperties = ['divisionsListLength', 'divisionName', 'locationsListLength', 'locationName', 'trackListLength', 'trackName', 'trackType']
         if PROPERTY_CHANGE_EVENT.propertyName in jmriProperties:
 
-            for subroutine in PSE.getSubroutineDirs():
-                xModule = 'Subroutines_Activated.{}'.format(subroutine)
-                package = __import__(xModule, fromlist=['Model'], level=-1)
+            for package in getSubroutineRegistry():
                 package.Model.initializeSubroutine()
 
             _psLog.debug(PROPERTY_CHANGE_EVENT)
 
         if PROPERTY_CHANGE_EVENT.propertyName == 'opsResetSubroutine':
 
-            for subroutine in PSE.getSubroutineDirs():
-                xModule = 'Subroutines_Activated.{}'.format(subroutine)
-                package = __import__(xModule, fromlist=['Model'], level=-1)
+            for package in getSubroutineRegistry():
                 package.Model.resetSubroutine()
 
             _psLog.debug(PROPERTY_CHANGE_EVENT)
 
         if PROPERTY_CHANGE_EVENT.propertyName == 'opsRefreshSubroutine':
 
-            for subroutine in PSE.getSubroutineDirs():
-                xModule = 'Subroutines_Activated.{}'.format(subroutine)
-                package = __import__(xModule, fromlist=['Model'], level=-1)
+            for package in getSubroutineRegistry():
                 package.Model.refreshSubroutine()
 
             _psLog.debug(PROPERTY_CHANGE_EVENT)
@@ -177,14 +179,157 @@ class LocationsPropertyChange(PSE.JAVA_BEANS.PropertyChangeListener):
         return
 
 
-def refreshSubroutines():
+def extendTrainManifest(trainObject):
     """
-    Called by window activated.
+    The manifest pipeline for a built train.
+    The JMRI manifest is read once, extended by PSE.extendManifest,
+    then by each subroutine's Controller.extendTrainManifest if it has one,
+    and written once.
+    """
+
+    _psLog.debug('extendTrainManifest')
+
+    trainName = trainObject.toString()
+    PSE.TRAIN_MANIFESTS.pop(trainName, None) # JMRI just wrote a new one
+
+    manifest = PSE.getTrainManifest(trainName)
+    PSE.extendManifest(trainObject, manifest)
+
+    for package in getSubroutineRegistry():
+        manifestStage = getattr(package.Controller, 'extendTrainManifest', None)
+        if manifestStage:
+            manifestStage(manifest)
+
+    PSE.putTrainManifest(trainName, manifest)
+
+    return manifest
+
+def makeSubroutineRegistry():
+    """
+    Resolves the Controller and Model modules of every activated subroutine once,
+    so the listeners don't list the subroutine directory and import on every event.
+    Also makes the train property dispatch table from each Controller.SUBSCRIBED_PROPERTIES.
+    Called by:
+    MainScript.makePsPlugin
     """
 
+    global SUBROUTINE_REGISTRY
+    SUBROUTINE_REGISTRY = []
+
     for subroutine in PSE.getSubroutineDirs():
         xModule = 'Subroutines_Activated.{}'.format(subroutine)
-        package = __import__(xModule, fromlist=['Model'], level=-1)
+        package = __import__(xModule, fromlist=['Controller', 'Model'], level=-1)
+        SUBROUTINE_REGISTRY.append(package)
+
+    _makeDispatchTable()
+
+    _psLog.debug('Subroutine registry: ' + str(len(SUBROUTINE_REGISTRY)) + ' subroutines')
+
+    return SUBROUTINE_REGISTRY
+
+def clearSubroutineRegistry():
+    """
+    The registry is rebuilt on next use.
+    Called by:
+    MainScriptListeners.rsItemSelected
+    """
+
+    global SUBROUTINE_REGISTRY, DISPATCH_TABLE
+    SUBROUTINE_REGISTRY = None
+    DISPATCH_TABLE = None
+
+    return
+
+def getSubroutineRegistry():
+    """
+    Returns the list of activated subroutine packages, each with .Controller and .Model.
+    """
+
+    if SUBROUTINE_REGISTRY is None:
+        makeSubroutineRegistry()
+
+    return SUBROUTINE_REGISTRY
+
+def _makeDispatchTable():
+    """
+    Helper function for makeSubroutineRegistry()
+    DISPATCH_TABLE is {propertyName: [package, ...]}, in registry order.
+    A Controller without SUBSCRIBED_PROPERTIES gets every event, listed under '*'.
+    """
+
+    global DISPATCH_TABLE
+    DISPATCH_TABLE = {'*': []}
+
+    propertyNames = set()
+    for package in SUBROUTINE_REGISTRY:
+        propertyNames.update(getattr(package.Controller, 'SUBSCRIBED_PROPERTIES', []))
+
+    for package in SUBROUTINE_REGISTRY:
+        subscribedProperties = getattr(package.Controller, 'SUBSCRIBED_PROPERTIES', None)
+        if subscribedProperties is None:
+            DISPATCH_TABLE['*'].append(package)
+
+        for propertyName in propertyNames:
+            if subscribedProperties is None or propertyName in subscribedProperties:
+                DISPATCH_TABLE.setdefault(propertyName, []).append(package)
+
+    return
+
+def getSubscribers(propertyName):
+    """
+    Returns the subroutine packages whose TrainsPropertyParser wants this train property.
+    """
+
+    getSubroutineRegistry()
+
+    try:
+        return DISPATCH_TABLE[propertyName]
+    except KeyError:
+        return DISPATCH_TABLE['*']
+
+def _timedDispatch(subroutineName, handler):
+    """
+    Calls a TrainsPropertyParser phase and adds its count and run time to DISPATCH_STATS.
+    """
+
+    startTime = PSE.TIME.time()
+    handler()
+    runTime = PSE.TIME.time() - startTime
+
+    handlerName = u'{}.{}'.format(subroutineName, handler.__name__)
+    stats = DISPATCH_STATS.setdefault(handlerName, {'calls':0, 'time':0.0})
+    stats['calls'] += 1
+    stats['time'] += runTime
+
+    return
+
+def getDispatchStats():
+    """
+    Returns {'<subroutine>.<phase>': {'calls':n, 'time':seconds}} since the plugin was opened.
+    """
+
+    return DISPATCH_STATS
+
+def logDispatchStats():
+    """
+    Writes the dispatch call counts and run times to the log.
+    Called by:
+    PatternScriptsFrameListener.windowClosing
+    """
+
+    for handlerName, stats in sorted(DISPATCH_STATS.items()):
+        _psLog.info(u'{} calls: {}, run time (sec): {}'.format(handlerName, stats['calls'], round(stats['time'], 4)))
+
+    DISPATCH_STATS.clear()
+
+    return
+
+def refreshSubroutines():
+    """
+    Called by window activated.
+    """
+
+    for package in getSubroutineRegistry():
         package.Model.refreshSubroutine()
 
     return
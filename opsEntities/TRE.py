@@ -77,265 +77,269 @@ def translateMessageFormat():
 
     return
 
+def makeLineFormats():
+    """
+    Clears the compiled line formats so they are remade from the current print options.
+    Called at the start of each report, after makeReportItemWidthMatrix and translateMessageFormat.
+    """
+
+    PSE.LINE_FORMATS = {}
+
+    return
+
+"""Each field item maps to a function that pulls its value out of the rolling stock dictionary."""
+
+_LOCO_FIELDS = {
+    'Road': lambda loco: loco['road'],
+    'Number': lambda loco: loco['number'],
+    'Type': lambda loco: loco['carType'],
+    'Model': lambda loco: loco['model'],
+    'Length': lambda loco: loco['length'],
+    'Weight': lambda loco: loco['weightTons'],
+    'Consist': lambda loco: loco['consist'],
+    'Owner': lambda loco: loco['owner'],
+    'Track': lambda loco: loco['location']['track']['userName'],
+    'Destination': lambda loco: loco['destination']['userName'],
+    'Location': lambda loco: loco['location']['userName'],
+    'Comment': lambda loco: loco['comment'],
+    'DCC_Address': lambda loco: loco['dccAddress']
+    }
+
+_CAR_FIELDS = {
+    'Road': lambda car: car[u'road'],
+    'Number': lambda car: car[u'number'],
+    'Type': lambda car: car[u'carType'],
+    'Length': lambda car: car[u'length'],
+    'Weight': lambda car: car[u'weightTons'],
+    'Load': lambda car: car[u'load'],
+    'Load_Type': lambda car: car[u'loadType'],
+    'Hazardous': lambda car: car[u'hazardous'],
+    'Color': lambda car: car[u'color'],
+    'Kernel': lambda car: car[u'kernel'],
+    'Kernel_Size': lambda car: car[u'kernelSize'],
+    'Owner': lambda car: car[u'owner'],
+    'Division': lambda car: car[u'division'],
+    'Location': lambda car: car['location'][u'userName'],
+    'Track': lambda car: car['location']['track'][u'userName'],
+    'Destination': lambda car: car['destination'][u'userName'],
+    'Dest&Track': lambda car: u'{}-{}'.format(car['destination'][u'userName'], car['destination']['track'][u'userName']),
+    'Final_Dest': lambda car: car['finalDestination'][u'userName'],
+    'FD&Track': lambda car: u'{}-{}'.format(car['finalDestination'][u'userName'], car['finalDestination']['track'][u'userName']),
+    'Comment': lambda car: car[u'comment'],
+    'SetOut_Msg': lambda car: car[u'removeComment'],
+    'PickUp_Msg': lambda car: car[u'addComment'],
+    'RWE': lambda car: car[u'returnWhenEmpty']
+    }
+
 def translateLocoFormat(loco):
     """
     For items found in the Setup.get<loco>ManifestMessageFormat()
     """
-                
-    newCarFormat = {}
-
-    newCarFormat['Road'] = loco['road']
-    newCarFormat['Number'] = loco['number']
-    newCarFormat['Type'] = loco['carType']
-    newCarFormat['Model'] = loco['model']
-    newCarFormat['Length'] = loco['length']
-    newCarFormat['Weight'] = loco['weightTons']
-    newCarFormat['Consist'] = loco['consist']
-    newCarFormat['Owner'] = loco['owner']
-    newCarFormat['Track'] = loco['location']['track']['userName']
-    newCarFormat['Destination'] = loco['destination']['userName']
-    newCarFormat['Location'] = loco['location']['userName']
-    newCarFormat['Comment'] = loco['comment']
-    newCarFormat['DCC_Address'] = loco['dccAddress']
-
-    return newCarFormat
+
+    return dict((field, extractor(loco)) for field, extractor in _LOCO_FIELDS.items())
 
 def translateCarFormat(car):
     """
     For items found in the Setup.get<car>ManifestMessageFormat()
     """
-                
-    newCarFormat = {}
-
-    newCarFormat['Road'] = car[u'road']
-    newCarFormat['Number'] = car[u'number']
-    newCarFormat['Type'] = car[u'carType']
-    newCarFormat['Length'] = car[u'length']
-    newCarFormat['Weight'] = car[u'weightTons']
-    newCarFormat['Load'] = car[u'load']
-    newCarFormat['Load_Type'] = car[u'loadType']
-    newCarFormat['Hazardous'] = car[u'hazardous']
-    newCarFormat['Color'] = car[u'color']
-    newCarFormat['Kernel'] = car[u'kernel']
-    newCarFormat['Kernel_Size'] = car[u'kernelSize']
-    newCarFormat['Owner'] = car[u'owner']
-    newCarFormat['Division'] = car[u'division']
-    newCarFormat['Location'] = car['location'][u'userName']
-    newCarFormat['Track'] = car['location']['track'][u'userName']
-    newCarFormat['Destination'] = car['destination'][u'userName']
-    newCarFormat['Dest&Track'] = u'{}-{}'.format(car['destination'][u'userName'], car['destination']['track'][u'userName'])
-    newCarFormat['Final_Dest'] = car['finalDestination'][u'userName']
-    newCarFormat['FD&Track'] = u'{}-{}'.format(car['finalDestination'][u'userName'], car['finalDestination']['track'][u'userName'])
-    newCarFormat['Comment'] = car[u'comment']
-    newCarFormat['SetOut_Msg'] = car[u'removeComment']
-    newCarFormat['PickUp_Msg'] = car[u'addComment']
-    newCarFormat['RWE'] = car[u'returnWhenEmpty']
-
-    return newCarFormat
+
+    return dict((field, extractor(car)) for field, extractor in _CAR_FIELDS.items())
 
 def getShortLoadType(car):
     """
     Replaces empty and load with E, L, or O for occupied.
+    Works from the manifest or pattern dictionary, the car is only looked up in JMRI if a field is missing.
+    """
+
+    try:
+        loadName = car['load']
+        loadType = car['loadType']
+        isOccupied = car['caboose'] or car['passenger']
+    except KeyError:
+        carObject = PSE.CM.getByRoadAndNumber(car['road'], car['number'])
+        loadName = carObject.getLoadName()
+        loadType = carObject.getLoadType()
+        isOccupied = carObject.isCaboose() or carObject.isPassenger()
+
+    return classifyLoadType(loadName, loadType, isOccupied)
+
+def classifyLoadType(loadName, loadType, isOccupied):
+    """
     JMRI defines custom load type as empty but default load type as E, hence the 'or' statement.
     Load, Empty, Occupied and Unknown are translated by the bundle.
     """
 
-    carObject = PSE.CM.getByRoadAndNumber(car['road'], car['number'])
+    letters = _getLoadTypeLetters()
 
-    lt =  PSE.getBundleItem(u'Unknown').upper()[0]
-    if carObject.getLoadName() == 'E':
-        lt = PSE.getBundleItem(u'Empty').upper()[0]
-    if carObject.getLoadName() == 'L':
-        lt = PSE.getBundleItem(u'Load').upper()[0]
+    lt = letters['Unknown']
+    if loadName == 'E':
+        lt = letters['Empty']
+    if loadName == 'L':
+        lt = letters['Load']
 
-    if carObject.getLoadType().lower() == 'empty' or carObject.getLoadType() == 'E':
-        lt = PSE.getBundleItem(u'Empty').upper()[0]
-    if carObject.getLoadType().lower() == 'load' or carObject.getLoadType() == 'L':
-        lt = PSE.getBundleItem(u'Load').upper()[0]
+    if loadType.lower() == 'empty' or loadType == 'E':
+        lt = letters['Empty']
+    if loadType.lower() == 'load' or loadType == 'L':
+        lt = letters['Load']
 
-    if carObject.isCaboose() or carObject.isPassenger():
-        lt = PSE.getBundleItem(u'Occupied').upper()[0]
+    if isOccupied:
+        lt = letters['Occupied']
 
     return lt
 
-def pickupLoco(loco, manifest, twoCol):
+def _getLoadTypeLetters():
     """
-    Based on the JMRI version.
+    The translated first letters of Empty, Load, Occupied and Unknown, memoized per locale.
+    PSE.LOAD_TYPE_LETTERS is cleared by Bundle.setupBundle.
     """
 
-    carItems = translateLocoFormat(loco)
-
-    line = ''
-
-    messageFormat = PSE.JMRI.jmrit.operations.setup.Setup.getPickupEngineMessageFormat()
-
-    for messageItem in messageFormat:
-        if 'Tab' in messageItem or messageItem == ' ':
-            continue
-
-        lineItem = carItems[PSE.ROSETTA[messageItem]]
-        if not lineItem: # JMRI v4 accomodation
-            lineItem = ' '
-        lineWidth = PSE.REPORT_ITEM_WIDTH_MATRIX[messageItem]
-
-    # Special case handling for loco number
-        if PSE.ROSETTA[messageItem] == 'Number':
-            lineItem = lineItem.rjust(lineWidth)
+    psLocale = PSE.psLocale()
 
-        line += u'{} '.format(lineItem.ljust(lineWidth)[:lineWidth])
+    try:
+        return PSE.LOAD_TYPE_LETTERS[psLocale]
+    except KeyError:
+        letters = {}
+        for item in (u'Empty', u'Load', u'Occupied', u'Unknown'):
+            letters[item] = PSE.getBundleItem(item).upper()[0]
+        PSE.LOAD_TYPE_LETTERS[psLocale] = letters
 
-    return line
+        return letters
 
-def setoutLoco(loco, manifest, twoCol):
+def _getMessageFormat(lineType, manifest):
     """
-    Based on the JMRI version.
+    Helper function for _getLineFormat()
     """
 
-    carItems = translateLocoFormat(loco)
-
-    line = ''
-
-    messageFormat = PSE.JMRI.jmrit.operations.setup.Setup.getDropEngineMessageFormat()
-
-    for messageItem in messageFormat:
-        if 'Tab' in messageItem or messageItem == ' ':
-            continue
-
-        lineItem = carItems[PSE.ROSETTA[messageItem]]
-        if not lineItem: # JMRI v4 accomodation
-            lineItem = ' '
-        lineWidth = PSE.REPORT_ITEM_WIDTH_MATRIX[messageItem]
-
-    # Special case handling for loco number
-        if PSE.ROSETTA[messageItem] == 'Number':
-            lineItem = lineItem.rjust(lineWidth)
+    OSU = PSE.JMRI.jmrit.operations.setup
+
+    if lineType == 'pickupLoco':
+        return OSU.Setup.getPickupEngineMessageFormat()
+    if lineType == 'setoutLoco':
+        return OSU.Setup.getDropEngineMessageFormat()
+
+    if lineType == 'pickupCar' and manifest:
+        return OSU.Setup.getPickupManifestMessageFormat()
+    if lineType == 'pickupCar':
+        return OSU.Setup.getPickupSwitchListMessageFormat()
+    if lineType == 'dropCar' and manifest:
+        return OSU.Setup.getDropManifestMessageFormat()
+    if lineType == 'dropCar':
+        return OSU.Setup.getDropSwitchListMessageFormat()
+    if lineType == 'localMoveCar' and manifest:
+        return OSU.Setup.getLocalManifestMessageFormat()
+    if lineType == 'localMoveCar':
+        return OSU.Setup.getLocalSwitchListMessageFormat()
+
+def _getLineFormat(lineType, manifest):
+    """
+    Returns the compiled line format for a line type, compiling it on first use.
+    """
 
-        line += u'{} '.format(lineItem.ljust(lineWidth)[:lineWidth])
+    try:
+        return PSE.LINE_FORMATS[(lineType, manifest)]
+    except KeyError:
+        isLoco = lineType in ('pickupLoco', 'setoutLoco')
+        lineFormat = compileLineFormat(_getMessageFormat(lineType, manifest), isLoco)
+        PSE.LINE_FORMATS[(lineType, manifest)] = lineFormat
 
-    return line
+        return lineFormat
 
-def pickupCar(car, manifest, twoCol):
+def compileLineFormat(messageFormat, isLoco):
     """
-    Based on the JMRI version.
+    Turns a JMRI message format into a list of (extractor, width, justification) tuples.
+    PSE.ROSETTA and PSE.REPORT_ITEM_WIDTH_MATRIX are looked up once here instead of once per line.
     """
 
-    carItems = translateCarFormat(car)
-
-    line = ''
+    lineFormat = []
 
-    if manifest:
-        messageFormat = PSE.JMRI.jmrit.operations.setup.Setup.getPickupManifestMessageFormat()
-    else:
-        messageFormat = PSE.JMRI.jmrit.operations.setup.Setup.getPickupSwitchListMessageFormat()
+    fields = _CAR_FIELDS
+    if isLoco:
+        fields = _LOCO_FIELDS
 
     for messageItem in messageFormat:
-
         if 'Tab' in messageItem or messageItem == ' ':
             continue
 
-        lineItem = carItems[PSE.ROSETTA[messageItem]]
+        field = PSE.ROSETTA[messageItem]
+        extractor = fields[field]
         lineWidth = PSE.REPORT_ITEM_WIDTH_MATRIX[messageItem]
+        justification = _leftJustify
 
+        if isLoco:
+            extractor = _orBlank(extractor) # JMRI v4 accomodation
     # Special case handling for car load type
-        if PSE.ROSETTA[messageItem] == 'Load_Type':
-            lineItem = getShortLoadType(car).ljust(1)
+        if field == 'Load_Type' and not isLoco:
+            extractor = getShortLoadType
             lineWidth = 1
-    # Special case handling for car number
-        if PSE.ROSETTA[messageItem] == 'Number':
-            lineItem = lineItem.rjust(lineWidth)
     # Special case handling for the hazardous flag
-        if PSE.ROSETTA[messageItem] == 'Hazardous' and car['hazardous']:
-            lineItem = messageItem[0].upper()
-            lineWidth = 1
-        elif PSE.ROSETTA[messageItem] == 'Hazardous' and not car['hazardous']:
-            lineItem = ' '
+        if field == 'Hazardous' and not isLoco:
+            extractor = _hazardousFlag(messageItem[0].upper())
             lineWidth = 1
+    # Special case handling for rolling stock number
+        if field == 'Number':
+            justification = _rightJustify
 
-        line += u'{} '.format(lineItem.ljust(lineWidth)[:lineWidth])
+        lineFormat.append((extractor, lineWidth, justification))
 
-    return line
+    return lineFormat
 
-def dropCar(car, manifest, twoCol):
+def formatLine(lineFormat, rs):
     """
-    Based on the JMRI version.
+    Makes one report line from a compiled line format.
     """
 
-    carItems = translateCarFormat(car)
+    return u''.join([justification(extractor(rs), lineWidth) for extractor, lineWidth, justification in lineFormat])
 
-    line = ''
+def _leftJustify(lineItem, lineWidth):
 
-    if manifest:
-        messageFormat = PSE.JMRI.jmrit.operations.setup.Setup.getDropManifestMessageFormat()
-    else:
-        messageFormat = PSE.JMRI.jmrit.operations.setup.Setup.getDropSwitchListMessageFormat()
+    return u'{} '.format(lineItem.ljust(lineWidth)[:lineWidth])
 
-    for messageItem in messageFormat:
+def _rightJustify(lineItem, lineWidth):
 
-        if 'Tab' in messageItem or messageItem == ' ':
-            continue
+    return u'{} '.format(lineItem.rjust(lineWidth)[:lineWidth])
 
-        lineItem = carItems[PSE.ROSETTA[messageItem]]
-        lineWidth = PSE.REPORT_ITEM_WIDTH_MATRIX[messageItem]
+def _orBlank(extractor):
 
-    # Special case handling for car load type
-        if PSE.ROSETTA[messageItem] == 'Load_Type':
-            lineItem = getShortLoadType(car).ljust(1)
-            lineWidth = 1
-    # Special case handling for car number
-        if PSE.ROSETTA[messageItem] == 'Number':
-            lineItem = lineItem.rjust(lineWidth)
-    # Special case handling for the hazardous flag
-        if PSE.ROSETTA[messageItem] == 'Hazardous' and car['hazardous']:
-            lineItem = messageItem[0].upper()
-            lineWidth = 1
-        elif PSE.ROSETTA[messageItem] == 'Hazardous' and not car['hazardous']:
-            lineItem = ' '
-            lineWidth = 1
+    return lambda rs: extractor(rs) or ' '
 
-        line += u'{} '.format(lineItem.ljust(lineWidth)[:lineWidth])
+def _hazardousFlag(flag):
 
-    return line
+    return lambda car: flag if car['hazardous'] else ' '
 
-def localMoveCar(car, manifest, twoCol):
+def pickupLoco(loco, manifest, twoCol):
     """
     Based on the JMRI version.
     """
 
-    carItems = translateCarFormat(car)
+    return formatLine(_getLineFormat('pickupLoco', manifest), loco)
 
-    line = ''
+def setoutLoco(loco, manifest, twoCol):
+    """
+    Based on the JMRI version.
+    """
 
-    if manifest:
-        messageFormat = PSE.JMRI.jmrit.operations.setup.Setup.getLocalManifestMessageFormat()
-    else:
-        messageFormat = PSE.JMRI.jmrit.operations.setup.Setup.getLocalSwitchListMessageFormat()
+    return formatLine(_getLineFormat('setoutLoco', manifest), loco)
 
-    for messageItem in messageFormat:
+def pickupCar(car, manifest, twoCol):
+    """
+    Based on the JMRI version.
+    """
 
-        if 'Tab' in messageItem or messageItem == ' ':
-            continue
+    return formatLine(_getLineFormat('pickupCar', manifest), car)
 
-        lineItem = carItems[PSE.ROSETTA[messageItem]]
-        lineWidth = PSE.REPORT_ITEM_WIDTH_MATRIX[messageItem]
+def dropCar(car, manifest, twoCol):
+    """
+    Based on the JMRI version.
+    """
 
-    # Special case handling for car load type
-        if PSE.ROSETTA[messageItem] == 'Load_Type':
-            lineItem = getShortLoadType(car).ljust(1)
-            lineWidth = 1
-    # Special case handling for car number
-        if PSE.ROSETTA[messageItem] == 'Number':
-            lineItem = lineItem.rjust(lineWidth)
-    # Special case handling for the hazardous flag
-        if PSE.ROSETTA[messageItem] == 'Hazardous' and car['hazardous']:
-            lineItem = messageItem[0].upper()
-            lineWidth = 1
-        elif PSE.ROSETTA[messageItem] == 'Hazardous' and not car['hazardous']:
-            lineItem = ' '
-            lineWidth = 1
+    return formatLine(_getLineFormat('dropCar', manifest), car)
 
-        line += u'{} '.format(lineItem.ljust(lineWidth)[:lineWidth])
+def localMoveCar(car, manifest, twoCol):
+    """
+    Based on the JMRI version.
+    """
 
-    return line
+    return formatLine(_getLineFormat('localMoveCar', manifest), car)
 
 def sortWorkOrder(jmriManifest):
 
@@ -343,10 +347,9 @@ def sortWorkOrder(jmriManifest):
         # location['engines']['add'].sort(key=lambda row: row['sequence'])
         # location['engines']['remove'].sort(key=lambda row: row['sequence'])
 
-        location['cars']['add'].sort(key=lambda row: row['sequence'])
-        location['cars']['add'].sort(key=lambda row: row['location']['track']['userName'])
+        location['cars']['add'].sort(key=PSE.compileSortKey(['sequence', 'location track userName']))
 
-        location['cars']['remove'].sort(key=lambda row: row['sequence'])
+        location['cars']['remove'].sort(key=PSE.compileSortKey(['sequence']))
 
     return jmriManifest
 
@@ -386,7 +389,7 @@ def getOpsTrainList(jmriManifest):
         for car in location['cars']['add']:
             if car['isLocal']:
                 continue
-            newSeq = str(int(car['sequence']) - 1000) # Head end pick up
+            newSeq = int(car['sequence']) - 1000 # Head end pick up
             car.update({'sequence':newSeq})
             pickUp.append(car)
         for car in location['cars']['remove']:
@@ -401,10 +404,10 @@ def getOpsTrainList(jmriManifest):
             if car['name'] not in setOut:
                 carsOnTrain.append(car)
 
-        carsOnTrain.sort(key=lambda row: row['sequence'])
+        carsOnTrain.sort(key=PSE.compileSortKey(['sequence']))
         newSeq = 6001
         for car in carsOnTrain:
-            car.update({'sequence':str(newSeq)})
+            car.update({'sequence':newSeq})
             newSeq += 1
 
         location['cars']['add'] = carsOnTrain
@@ -19,34 +19,40 @@ SCRIPT_REV = 20231001
 
 _psLog = PSE.LOGGING.getLogger('OPS.OE.TextReports')
 
-def printExtendedTrainList(trainName):
+def printExtendedTrainList(trainName, jmriManifest=None):
+    """
+    jmriManifest is the extended manifest if the caller already has it.
+    """
 
     _psLog.debug('printExtendedTrainList')
 
-    jmriManifest = PSE.getTrainManifest(trainName)
+    if not jmriManifest:
+        jmriManifest = PSE.getTrainManifest(trainName)
     trainList = TRE.getOpsTrainList(jmriManifest)
-    trainListText = opsTrainList(trainList)
 
-    trainListName = PSE.readConfigFile()['Main Script']['US']['OTL'].format(trainName, 'txt')
+    trainListName = PSE.readConfigFile('Main Script')['US']['OTL'].format(trainName, 'txt')
     trainListPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'manifests', trainListName)
-    PSE.genericWriteReport(trainListPath, trainListText)
+    opsTrainList(trainList, trainListPath)
     PSE.genericDisplayReport(trainListPath)
 
     print('{}.{}'.format(SCRIPT_NAME, 'printExtendedTrainList'))
 
     return
 
-def printExtendedWorkOrder(trainName):
+def printExtendedWorkOrder(trainName, jmriManifest=None):
+    """
+    jmriManifest is the extended manifest if the caller already has it.
+    """
 
     _psLog.debug('printExtendedWorkOrder')
 
-    jmriManifest = PSE.getTrainManifest(trainName)
+    if not jmriManifest:
+        jmriManifest = PSE.getTrainManifest(trainName)
     jmriManifest = TRE.sortWorkOrder(jmriManifest)
-    workOrderText = opsJmriWorkOrder(jmriManifest)
 
-    workOrderName = PSE.readConfigFile()['Main Script']['US']['OWO'].format(trainName, 'txt')
+    workOrderName = PSE.readConfigFile('Main Script')['US']['OWO'].format(trainName, 'txt')
     workOrderPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'switchLists', workOrderName)
-    PSE.genericWriteReport(workOrderPath, workOrderText)
+    opsJmriWorkOrder(jmriManifest, workOrderPath)
     PSE.genericDisplayReport(workOrderPath)
 
     print('{}.{}'.format(SCRIPT_NAME, 'printExtendedWorkOrder'))
@@ -57,106 +63,141 @@ def printExtendedWorkOrder(trainName):
 """ Text report generators """
 
 
-def opsTextPatternReport():
+def opsTextPatternReport(filePath=None):
     """
     Creates a text Pattern Report from an OPS generated json file.
+    If filePath is given the report is streamed to it, otherwise the text is returned.
+    Called by:
+    Patterns.Controller.TrainsPropertyParser.postProcess
     """
 
     _psLog.debug('opsTextPatternReport')
 
     TRE.makeReportItemWidthMatrix()
     TRE.translateMessageFormat()
+    TRE.makeLineFormats()
 
-    reportName = PSE.readConfigFile()['Main Script']['US']['OPR'].format('OPS', 'json')
+    reportName = PSE.readConfigFile('Main Script')['US']['OPR'].format('OPS', 'json')
     reportPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
     report = PSE.loadJson(PSE.genericReadReport(reportPath))
-# Header    
-    textPatternReport  = u'{}\n'.format(report['railroad'])
-    textPatternReport += '\n'
-    textPatternReport += u'{}: {} {}\n'.format(PSE.getBundleItem(u'Pattern Report for location'), report['location'][u'userName'], report['division'][u'userName'])
-    textPatternReport += u'{}\n'.format(PSE.convertIsoToValidTime(report[u'date']))
-    textPatternReport += '\n'
-    textPatternReport += u'{}: {}\n'.format(PSE.getBundleItem('Engines sorted by'), ', '.join(PSE.getSortList('SL')))
-    textPatternReport += u'{}: {}\n'.format(PSE.getBundleItem('Cars sorted by'), ', '.join(PSE.getSortList('SC')))
-    textPatternReport += '\n'
-    fdTally = []
+
+    return _renderReport(_patternReportLines(report), filePath)
+
+def _patternReportLines(report):
+    """
+    Yields the text Pattern Report one line at a time.
+    """
+
+# Header
+    yield u'{}\n'.format(report['railroad'])
+    yield '\n'
+    yield u'{}: {} {}\n'.format(PSE.getBundleItem(u'Pattern Report for location'), report['location'][u'userName'], report['division'][u'userName'])
+    yield u'{}\n'.format(PSE.convertIsoToValidTime(report[u'date']))
+    yield '\n'
+    yield u'{}: {}\n'.format(PSE.getBundleItem('Engines sorted by'), ', '.join(PSE.getSortList('SL')))
+    yield u'{}: {}\n'.format(PSE.getBundleItem('Cars sorted by'), ', '.join(PSE.getSortList('SC')))
+    yield '\n'
+    fdByTrack = [] # (track name, final destination)
 # Body
+    formatPrefix = u' [{}] '.format('  ')
     for track in report[u'locations']: # For JMRI compatability, it's called report['locations'] but it's a list of tracks.
         carLength = 0
-        textPatternReport += u'{} {}\n'.format(PSE.getBundleItem('List of inventory at'), track[u'userName'])
+        yield u'{} {}\n'.format(PSE.getBundleItem('List of inventory at'), track[u'userName'])
     # Engines
-        textPatternReport += u'{}:\n'.format(PSE.getBundleItem(u'Engines'))
+        yield u'{}:\n'.format(PSE.getBundleItem(u'Engines'))
         if not track['engines']['add']:
-            textPatternReport += u' {}\n'.format(PSE.getBundleItem(u'None'))
+            yield u' {}\n'.format(PSE.getBundleItem(u'None'))
         for loco in track['engines']['add']:
-            formatPrefix = u' [{}] '.format('  ')
             line = TRE.pickupLoco(loco, True, False)
-            textPatternReport += u'{} {}\n'.format(formatPrefix ,line)
+            yield u'{} {}\n'.format(formatPrefix ,line)
     # Cars
-        textPatternReport += u'{}:\n'.format(PSE.getBundleItem(u'Cars'))
+        yield u'{}:\n'.format(PSE.getBundleItem(u'Cars'))
         if not track['cars']['add']:
-            textPatternReport += u' {}\n'.format(PSE.getBundleItem(u'None'))
+            yield u' {}\n'.format(PSE.getBundleItem(u'None'))
         for car in track['cars']['add']:
             carLength += int(car['length'])
-            fdTally.append(car['finalDestination']['userName'])
-            formatPrefix = u' [{}] '.format('  ')
+            fdByTrack.append((track[u'userName'], car['finalDestination']['userName']))
             line = TRE.localMoveCar(car, True, False)
-            textPatternReport += formatPrefix + ' ' + line + '\n'
+            yield u'{} {}\n'.format(formatPrefix ,line)
 
         summaryText = PSE.getBundleItem(u'Total cars:{},  Loads:{},  Empties:{}')
-        textPatternReport += summaryText.format(track['total'], track['loads'], track['empties']) + '\n'
+        yield summaryText.format(track['total'], track['loads'], track['empties']) + '\n'
 
         trackLength = track['length']['length']
         avail = trackLength - carLength
         summaryText = PSE.getBundleItem('Track length:{},  Equipment length:{},  Available:{}')
-        textPatternReport += summaryText.format(trackLength, carLength, avail) + '\n'
+        yield summaryText.format(trackLength, carLength, avail) + '\n'
 
-        textPatternReport += '\n'
+        yield '\n'
 
-    textPatternReport += u'{}:\n'.format(PSE.getBundleItem(u'Final Destination Totals'))
+    fdTotals, fdSubtotals = PSE.occuranceSubtotals(fdByTrack)
 
-    for track, count in sorted(PSE.occuranceTally(fdTally).items()):
-        if not track:
-            track = PSE.getBundleItem(u'None')
-        textPatternReport += ' ' + track + ' - ' + str(count) + '\n'
+    yield u'{}:\n'.format(PSE.getBundleItem(u'Final Destination Totals'))
+    for line in _finalDestinationLines(fdTotals):
+        yield line
 
-    return textPatternReport
+    for track in report[u'locations']:
+        if track[u'userName'] not in fdSubtotals:
+            continue
 
-def opsTextSwitchList():
+        yield '\n'
+        yield u'{} {}:\n'.format(PSE.getBundleItem(u'Final Destinations at'), track[u'userName'])
+        for line in _finalDestinationLines(fdSubtotals[track[u'userName']]):
+            yield line
+
+def _finalDestinationLines(fdTally):
+    """
+    Helper function for _patternReportLines().
+    """
+
+    for destination, count in sorted(fdTally.items()):
+        if not destination:
+            destination = PSE.getBundleItem(u'None')
+        yield u' {} - {}\n'.format(destination, count)
+
+def opsTextSwitchList(filePath=None):
     """
     Creates a text Switch List from an OPS generated json file.
+    If filePath is given the report is streamed to it, otherwise the text is returned.
+    Called by:
+    Patterns.SetCarsForm_Controller.opsPostProcess
     """
 
     _psLog.debug('opsTextSwitchList')
 
     TRE.makeReportItemWidthMatrix()
     TRE.translateMessageFormat()
+    TRE.makeLineFormats()
 
-    configFile = PSE.readConfigFile()
-
-    mcp = unicode(PSE.JMRI.jmrit.operations.setup.Setup.getLocalPrefix(), PSE.ENCODING)
-    hcp = configFile['Main Script']['US']['HCP']
-    longestStringLength = PSE.findLongestStringLength((mcp, hcp))
-
-    reportName = PSE.readConfigFile()['Main Script']['US']['OSL'].format('OPS', 'json')
+    reportName = PSE.readConfigFile('Main Script')['US']['OSL'].format('OPS', 'json')
     reportPath = PSE.OS_PATH.join(PSE.PROFILE_PATH, 'operations', 'jsonManifests', reportName)
     report = PSE.loadJson(PSE.genericReadReport(reportPath))
 
-    textSwitchList = ''
+    return _renderReport(_switchListLines(report), filePath)
+
+def _switchListLines(report):
+    """
+    Yields the text Switch List one line at a time.
+    """
+
+    mainConfig = PSE.readConfigFile('Main Script')
 
+    mcp = unicode(PSE.JMRI.jmrit.operations.setup.Setup.getLocalPrefix(), PSE.ENCODING)
+    hcp = mainConfig['US']['HCP']
+    longestStringLength = PSE.findLongestStringLength((mcp, hcp))
 # Header
-    textSwitchList += report['railroad'] + '\n'
-    textSwitchList += '\n'
-    textSwitchList += u'{}: {} {}\n'.format(PSE.getBundleItem('Switch List for location'), report['location']['userName'], report['division']['userName'])
-    textSwitchList += u'{}\n'.format(PSE.convertIsoToValidTime(report[u'date']))
-    textSwitchList += '\n'
+    yield report['railroad'] + '\n'
+    yield '\n'
+    yield u'{}: {} {}\n'.format(PSE.getBundleItem('Switch List for location'), report['location']['userName'], report['division']['userName'])
+    yield u'{}\n'.format(PSE.convertIsoToValidTime(report[u'date']))
+    yield '\n'
 # Body
     for track in report[u'locations']: # For JMRI compatability, it's called report['locations'] but it's a list of tracks.
-        textSwitchList += u'{} {}\n'.format(PSE.getBundleItem('List of inventory at'), track[u'userName'])
+        yield u'{} {}\n'.format(PSE.getBundleItem('List of inventory at'), track[u'userName'])
     # Locos
-        textSwitchList += u'{}:\n'.format(PSE.getBundleItem(u'Engines'))
+        yield u'{}:\n'.format(PSE.getBundleItem(u'Engines'))
         if not track['engines']['add']:
-            textSwitchList += u' {}\n'.format(PSE.getBundleItem(u'None'))
+            yield u' {}\n'.format(PSE.getBundleItem(u'None'))
         for loco in track['engines']['add']:
             currentTrack = loco['location']['track'][u'userName']
             destTrack = loco['destination']['track'][u'userName']
@@ -166,11 +207,11 @@ def opsTextSwitchList():
                 formatPrefix = mcp.format(longestStringLength)
 
             line = TRE.setoutLoco(loco, True, False)
-            textSwitchList += u'{} {} {}\n'.format(formatPrefix, line, loco['destination']['track'][u'userName'])
+            yield u'{} {} {}\n'.format(formatPrefix, line, loco['destination']['track'][u'userName'])
     # Cars
-        textSwitchList += u'{}:\n'.format(PSE.getBundleItem('Cars'))
+        yield u'{}:\n'.format(PSE.getBundleItem('Cars'))
         if not track['cars']['add']:
-            textSwitchList += u' {}\n'.format(PSE.getBundleItem(u'None'))
+            yield u' {}\n'.format(PSE.getBundleItem(u'None'))
         for car in track['cars']['add']:
             currentTrack = car['location']['track'][u'userName']
             destTrack = car['destination']['track'][u'userName']
@@ -182,20 +223,27 @@ def opsTextSwitchList():
                 formatPrefix = mcp.ljust(longestStringLength)
 
             line = TRE.localMoveCar(car, True, False)
-            textSwitchList += u'{} {}\n'.format(formatPrefix, line)
-        textSwitchList += '\n'
-
-    return textSwitchList
+            yield u'{} {}\n'.format(formatPrefix, line)
+        yield '\n'
 
-def opsJmriWorkOrder(manifest):
+def opsJmriWorkOrder(manifest, filePath=None):
     """"
     OPS version of the JMRI generated text manifest.
+    If filePath is given the report is streamed to it, otherwise the text is returned.
     """
 
     _psLog.debug('opsJmriWorkOrder')
 
     TRE.makeReportItemWidthMatrix()
     TRE.translateMessageFormat()
+    TRE.makeLineFormats()
+
+    return _renderReport(_workOrderLines(manifest), filePath)
+
+def _workOrderLines(manifest):
+    """
+    Yields the OPS work order one line at a time.
+    """
 
     TMT = PSE.JMRI.jmrit.operations.trains.TrainManifestText()
     pep = PSE.JMRI.jmrit.operations.setup.Setup.getPickupEnginePrefix()
@@ -203,142 +251,160 @@ def opsJmriWorkOrder(manifest):
     pcp = PSE.JMRI.jmrit.operations.setup.Setup.getPickupCarPrefix()
     dcp = PSE.JMRI.jmrit.operations.setup.Setup.getDropCarPrefix()
     mcp = PSE.JMRI.jmrit.operations.setup.Setup.getLocalPrefix()
-    hcp = PSE.readConfigFile()['Main Script']['US']['HCP']
+    hcp = PSE.readConfigFile('Main Script')['US']['HCP']
 
     longestStringLength = PSE.findLongestStringLength((pep, dep, pcp, dcp, mcp, hcp))
 # Header
-    textWorkOrder  = manifest[u'railroad'] + '\n'
-    textWorkOrder += '\n'
-    textWorkOrder += u'{} ({}) {}\n'.format(PSE.getBundleItem(u'Work order for train'), manifest[u'userName'], manifest[u'description'])
-    textWorkOrder += u'{}\n'.format(PSE.convertIsoToValidTime(manifest[u'date']))
-    textWorkOrder += u'{}\n'.format(manifest['comment'])
-    textWorkOrder += '\n'
+    yield manifest[u'railroad'] + '\n'
+    yield '\n'
+    yield u'{} ({}) {}\n'.format(PSE.getBundleItem(u'Work order for train'), manifest[u'userName'], manifest[u'description'])
+    yield u'{}\n'.format(PSE.convertIsoToValidTime(manifest[u'date']))
+    yield u'{}\n'.format(manifest['comment'])
+    yield '\n'
 # Body
     for location in manifest['locations']:
         sw = TMT.getStringScheduledWork().format(location[u'userName'])
-        textWorkOrder += u'{} {}\n'.format(sw, location['division']['userName'])
+        yield u'{} {}\n'.format(sw, location['division']['userName'])
     
     # Pick up locos
-        textWorkOrder += u'{}:\n'.format(PSE.getBundleItem(u'Engines'))
+        yield u'{}:\n'.format(PSE.getBundleItem(u'Engines'))
         for loco in location['engines']['add']:
             formatPrefix = pep.ljust(longestStringLength)
             line = TRE.pickupLoco(loco, True, False)
-            textWorkOrder += u'{} {}\n'.format(formatPrefix ,line)
+            yield u'{} {}\n'.format(formatPrefix ,line)
     # Set out locos
         for loco in location['engines']['remove']:
             formatPrefix = dep.ljust(longestStringLength)
             line = TRE.setoutLoco(loco, True, False)
-            textWorkOrder += u'{} {}\n'.format(formatPrefix ,line)
+            yield u'{} {}\n'.format(formatPrefix ,line)
 
         if len(location['engines']['add']) + len(location['engines']['remove']) == 0:
-            textWorkOrder += u' {}: {}\n'.format(PSE.getBundleItem(u'No work at'), location[u'userName'])
+            yield u' {}: {}\n'.format(PSE.getBundleItem(u'No work at'), location[u'userName'])
 
     # Pick up cars
-        textWorkOrder += u'{}:\n'.format(PSE.getBundleItem(u'Cars'))
+        yield u'{}:\n'.format(PSE.getBundleItem(u'Cars'))
         for car in location['cars']['add']:
             if car['isLocal'] or car['caboose']:
                 continue
             formatPrefix = pcp.ljust(longestStringLength)
             line = TRE.pickupCar(car, True, False)
-            textWorkOrder += u'{} {}\n'.format(formatPrefix ,line)
+            yield u'{} {}\n'.format(formatPrefix ,line)
     # Move cars
         for car in location['cars']['add']:
             if not car['isLocal'] or car['caboose']:
                 continue
             formatPrefix = mcp.ljust(longestStringLength)
             line = TRE.localMoveCar(car, True, False)
-            textWorkOrder += u'{} {}\n'.format(formatPrefix ,line)
+            yield u'{} {}\n'.format(formatPrefix ,line)
     # Set out cars
         for car in location['cars']['remove']:
             if car['isLocal'] or car['caboose']:
                 continue
             formatPrefix = dcp.ljust(longestStringLength)
             line = TRE.dropCar(car, True, False)
-            textWorkOrder += u'{} {}\n'.format(formatPrefix ,line)
+            yield u'{} {}\n'.format(formatPrefix ,line)
     # Pick up caboose
-        textWorkOrder += u'{}:\n'.format(PSE.getBundleItem(u'Caboose'))
+        yield u'{}:\n'.format(PSE.getBundleItem(u'Caboose'))
         for car in location['cars']['add']:
             if car['caboose']:
                 formatPrefix = pcp.ljust(longestStringLength)
                 line = TRE.pickupCar(car, True, False)
-                textWorkOrder += u'{} {}\n'.format(formatPrefix ,line)
+                yield u'{} {}\n'.format(formatPrefix ,line)
     # Set out caboose
         for car in location['cars']['remove']:
             if car['caboose']:
                 formatPrefix = dcp.ljust(longestStringLength)
                 line = TRE.dropCar(car, True, False)
-                textWorkOrder += u'{} {}\n'.format(formatPrefix ,line)
+                yield u'{} {}\n'.format(formatPrefix ,line)
 
         if len(location['cars']['add']) + len(location['cars']['remove']) == 0:
-            textWorkOrder += u' {}: {}\n'.format(PSE.getBundleItem(u'No work at'), location[u'userName'])
+            yield u' {}: {}\n'.format(PSE.getBundleItem(u'No work at'), location[u'userName'])
 
         try:
         # Location summary
             td = PSE.JMRI.jmrit.operations.setup.Setup.getDirectionString(location[u'trainDirection'])
-            textWorkOrder += TMT.getStringTrainDepartsCars().format(location[u'userName'], td, str(location['cars']['total']), str(location['length']['length']), location['length']['unit'], str(location['weight'])) + '\n'
+            summary = TMT.getStringTrainDepartsCars().format(location[u'userName'], td, str(location['cars']['total']), str(location['length']['length']), location['length']['unit'], str(location['weight'])) + '\n'
         except:
         # Footer
-            textWorkOrder += TMT.getStringTrainTerminates().format(manifest['locations'][-1][u'userName']) + '\n'
-
-        textWorkOrder += '\n'
+            summary = TMT.getStringTrainTerminates().format(manifest['locations'][-1][u'userName']) + '\n'
+        yield summary
 
-    return textWorkOrder
+        yield '\n'
 
-def opsTrainList(manifest):
+def opsTrainList(manifest, filePath=None):
     """
     Makes an OPS train list text report.
+    If filePath is given the report is streamed to it, otherwise the text is returned.
     """
 
     _psLog.debug('opsTrainList')
 
     TRE.makeReportItemWidthMatrix()
     TRE.translateMessageFormat()
-    TMT = PSE.JMRI.jmrit.operations.trains.TrainManifestText()
+    TRE.makeLineFormats()
 
-# Header
-    trainListText = u'{}\n'.format(manifest[u'railroad'])
-    trainListText += '\n'
-    trainListText += u'{} ({}) {}\n'.format(PSE.getBundleItem(u'Train list for train'), manifest[u'userName'], manifest[u'description'])
-    trainListText += u'{}\n'.format(PSE.convertIsoToValidTime(manifest[u'date']))
-    trainListText += u'{}\n'.format(manifest['comment'])
-    trainListText += '\n'
+    return _renderReport(_trainListLines(manifest), filePath)
+
+def _trainListLines(manifest):
+    """
+    Yields the OPS train list one line at a time.
+    """
 
+    TMT = PSE.JMRI.jmrit.operations.trains.TrainManifestText()
+# Header
+    yield u'{}\n'.format(manifest[u'railroad'])
+    yield '\n'
+    yield u'{} ({}) {}\n'.format(PSE.getBundleItem(u'Train list for train'), manifest[u'userName'], manifest[u'description'])
+    yield u'{}\n'.format(PSE.convertIsoToValidTime(manifest[u'date']))
+    yield u'{}\n'.format(manifest['comment'])
+    yield '\n'
 # Body
     for location in manifest['locations']:
-        trainListText += u'{}: {} {}\n'.format(PSE.getBundleItem(u'Train consist at'), location[u'userName'], location['division']['userName'])
+        yield u'{}: {} {}\n'.format(PSE.getBundleItem(u'Train consist at'), location[u'userName'], location['division']['userName'])
 
     # Pick up locos
-        trainListText += '{}:\n'.format(PSE.getBundleItem(u'Engines'))
+        yield u'{}:\n'.format(PSE.getBundleItem(u'Engines'))
         if not location['engines']['add']:
-            trainListText += ' {}\n'.format(PSE.getBundleItem(u'None'))
+            yield u' {}\n'.format(PSE.getBundleItem(u'None'))
         for loco in location['engines']['add']:
             line = TRE.pickupLoco(loco, True, False)
-            trainListText += u' {}\n'.format(line)
+            yield u' {}\n'.format(line)
     # Pick up cars
-        trainListText += u'{}:\n'.format(PSE.getBundleItem(u'Cars'))
+        yield u'{}:\n'.format(PSE.getBundleItem(u'Cars'))
         if not location['cars']['add']:
-            trainListText += u' {}\n'.format(PSE.getBundleItem(u'None'))
+            yield u' {}\n'.format(PSE.getBundleItem(u'None'))
         for car in location['cars']['add']:
             if car['isLocal'] or car['caboose']:
                 continue
             line = TRE.pickupCar(car, True, False)
             formattedSequence = u'{:02d}'.format(int(car['sequence']) - 6000)
-            trainListText += u' {} {}\n'.format(formattedSequence, line)
+            yield u' {} {}\n'.format(formattedSequence, line)
     # Pick up caboose
-        trainListText += u'{}:\n'.format(PSE.getBundleItem(u'Caboose'))
+        yield u'{}:\n'.format(PSE.getBundleItem(u'Caboose'))
         for car in location['cars']['add']:
             if car['caboose']:
                 line = TRE.pickupCar(car, True, False)
-                trainListText += u' {}\n'.format(line)
+                yield u' {}\n'.format(line)
 
         try: # Location summary
             td = PSE.JMRI.jmrit.operations.setup.Setup.getDirectionString(location[u'trainDirection'])
-            trainListText += TMT.getStringTrainDepartsCars().format(location['userName'], td, str(location['cars']['total']), str(location['length']['length']), location['length']['unit'], str(location['weight'])) + '\n\n'
+            summary = TMT.getStringTrainDepartsCars().format(location['userName'], td, str(location['cars']['total']), str(location['length']['length']), location['length']['unit'], str(location['weight'])) + '\n\n'
         except: # Terminates
-            trainListText += TMT.getStringTrainTerminates().format(manifest['locations'][-1][u'userName']) + '\n'
-            return trainListText
+            yield TMT.getStringTrainTerminates().format(manifest['locations'][-1][u'userName']) + '\n'
+            return
+        yield summary
+
+def _renderReport(reportLines, filePath):
+    """
+    Streams the lines of a text report to filePath and returns filePath.
+    Without a filePath the lines are joined and the text is returned.
+    """
+
+    if filePath:
+        PSE.genericWriteReportLines(filePath, reportLines)
+        return filePath
 
-    return trainListText
+    return u''.join(reportLines)
 
 def getDetailsForRollingStock(rs):
 